@@ -1,10 +1,10 @@
-import sys, os, json, keyboard, winreg
+import sys, os, json
 
-from PySide6.QtCore import Qt, QPoint
+from PySide6.QtCore import Qt, QPoint, QTimer
 from PySide6.QtGui import QAction, QIcon
 from PySide6.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QStyle
 from WidgetPanel import FloatLabel
-from SettingPanel import SettingsDialog
+from ConfigWriter import ConfigWriter
 
 # ----- 程序与资源 -----
 APP_NAME = "StockWidget"
@@ -17,6 +17,7 @@ def resource_path(rel_path):
 # ----- 配置存档 -----
 CONFIG_DIR = os.path.join(os.getenv("APPDATA") or os.path.expanduser("~"), APP_NAME)
 CONFIG_FILE = os.path.join(CONFIG_DIR, "SW_config.json")
+SNAPSHOT_FILE = os.path.join(CONFIG_DIR, "SW_snapshot.txt")   # 最近一次行情的原始行，启动时先显示
 
 def load_config():
     try:
@@ -25,60 +26,28 @@ def load_config():
     except Exception:
         return {}
 
-def save_config(cfg: dict):
-    if not os.path.exists(CONFIG_DIR):
-        os.makedirs(CONFIG_DIR, exist_ok=True)
-    tmp = CONFIG_FILE + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(cfg, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, CONFIG_FILE)
-
 class App(QApplication):
     def __init__(self, argv):
         super().__init__(argv)
         self.setQuitOnLastWindowClosed(False)
-        icon_path = resource_path(APP_ICON_FILE)
-        # load saved icon choice from config
+        # 配置只读取一次
         cfg = load_config()
-        icon_choice = cfg.get('app_icon')
-        self._app_icon_choice = icon_choice
-        def _resolve_icon(choice):
-            # choice can be None, 'default', 'std:NAME' or a file path
-            if not choice or choice == 'default':
-                p = resource_path(APP_ICON_FILE)
-                if os.path.exists(p):
-                    return QIcon(p)
-                return self.style().standardIcon(QStyle.SP_ComputerIcon)
-            if isinstance(choice, str) and choice.startswith('std:'):
-                key = choice.split(':',1)[1]
-                mapping = {
-                    'computer': QStyle.SP_ComputerIcon,
-                    'network': QStyle.SP_DriveNetIcon,
-                    'folder': QStyle.SP_DirIcon,
-                    'file': QStyle.SP_FileIcon,
-                    'trash': QStyle.SP_TrashIcon,
-                    'desktop': QStyle.SP_DesktopIcon,
-                }
-                sp = mapping.get(key, QStyle.SP_ComputerIcon)
-                return self.style().standardIcon(sp)
-            # assume it's a file path
-            try:
-                if os.path.exists(choice):
-                    return QIcon(choice)
-            except Exception:
-                pass
-            return self.style().standardIcon(QStyle.SP_ComputerIcon)
-
-        app_icon = _resolve_icon(icon_choice)
+        # load saved icon choice from config
+        self._app_icon_choice = cfg.get('app_icon')
+        app_icon = self._resolve_icon(self._app_icon_choice)
         self.setWindowIcon(app_icon)
 
-        cfg = load_config()
         self.win = FloatLabel(cfg)
-        # Apply start-on-boot setting from config
-        try:
-            self.set_start_on_boot(bool(cfg.get("start_on_boot", False)))
-        except Exception:
-            pass
+        # 先显示上次保存的行情（标注离线快照），实时拉取已在后台进行，到达后替换
+        self.win.restore_snapshot(SNAPSHOT_FILE)
+        self._snapshot_timer = QTimer(self)
+        self._snapshot_timer.setInterval(60 * 1000)
+        self._snapshot_timer.timeout.connect(lambda: self.win.save_snapshot(SNAPSHOT_FILE))
+        self._snapshot_timer.start()
+        # Apply start-on-boot setting from config（注册表访问放到窗口显示之后）
+        QTimer.singleShot(0, lambda: self.set_start_on_boot(bool(cfg.get("start_on_boot", False))))
+        # 设置变化只安排一次延迟写入：连续修改合并，内容未变不写盘，写盘在后台线程
+        self.config_writer = ConfigWriter(CONFIG_FILE, self.current_config, parent=self)
         self.win.set_on_change(self.save_now)
         self.win.set_open_settings_callback(self.open_settings)
 
@@ -118,6 +87,8 @@ class App(QApplication):
             self.settings_dlg.raise_()
             self.settings_dlg.activateWindow()
             return
+        # 设置对话框只在首次打开时导入
+        from SettingPanel import SettingsDialog
         self.settings_dlg = SettingsDialog(self.win, self.win, app=self)
         # 将设置窗口放在屏幕正中
         screen = QApplication.primaryScreen().availableGeometry()
@@ -131,49 +102,56 @@ class App(QApplication):
 
     def quit_app(self):
         self.tray.hide()
-        self.save_now()
-        keyboard.unhook_all_hotkeys()
+        self.config_writer.close()
+        self.win.save_snapshot(SNAPSHOT_FILE)
+        self.win.shutdown()
+        if "keyboard" in sys.modules:
+            sys.modules["keyboard"].unhook_all_hotkeys()
         sys.exit(0)
 
     def save_now(self):
+        self.config_writer.schedule()
+
+    def current_config(self):
         cfg = self.win.current_config()
         # persist selected app icon
         try:
             cfg['app_icon'] = getattr(self, '_app_icon_choice', None)
         except Exception:
             pass
-        save_config(cfg)
+        return cfg
+
+    def _resolve_icon(self, choice):
+        # choice can be None, 'default', 'std:NAME' or a file path
+        if not choice or choice == 'default':
+            p = resource_path(APP_ICON_FILE)
+            if os.path.exists(p):
+                return QIcon(p)
+            return self.style().standardIcon(QStyle.SP_ComputerIcon)
+        if isinstance(choice, str) and choice.startswith('std:'):
+            key = choice.split(':',1)[1]
+            mapping = {
+                'computer': QStyle.SP_ComputerIcon,
+                'network': QStyle.SP_DriveNetIcon,
+                'folder': QStyle.SP_DirIcon,
+                'file': QStyle.SP_FileIcon,
+                'trash': QStyle.SP_TrashIcon,
+                'desktop': QStyle.SP_DesktopIcon,
+            }
+            sp = mapping.get(key, QStyle.SP_ComputerIcon)
+            return self.style().standardIcon(sp)
+        # assume it's a file path
+        try:
+            if os.path.exists(choice):
+                return QIcon(choice)
+        except Exception:
+            pass
+        return self.style().standardIcon(QStyle.SP_ComputerIcon)
 
     def set_app_icon(self, choice):
         """Set application and tray icon. `choice` can be None/'default', 'std:KEY' or a file path."""
         self._app_icon_choice = choice
-        # resolve to QIcon
-        def _resolve_icon(choice):
-            if not choice or choice == 'default':
-                p = resource_path(APP_ICON_FILE)
-                if os.path.exists(p):
-                    return QIcon(p)
-                return self.style().standardIcon(QStyle.SP_ComputerIcon)
-            if isinstance(choice, str) and choice.startswith('std:'):
-                key = choice.split(':',1)[1]
-                mapping = {
-                    'computer': QStyle.SP_ComputerIcon,
-                    'network': QStyle.SP_DriveNetIcon,
-                    'folder': QStyle.SP_DirIcon,
-                    'file': QStyle.SP_FileIcon,
-                    'trash': QStyle.SP_TrashIcon,
-                    'desktop': QStyle.SP_DesktopIcon,
-                }
-                sp = mapping.get(key, QStyle.SP_ComputerIcon)
-                return self.style().standardIcon(sp)
-            try:
-                if os.path.exists(choice):
-                    return QIcon(choice)
-            except Exception:
-                pass
-            return self.style().standardIcon(QStyle.SP_ComputerIcon)
-
-        icon = _resolve_icon(choice)
+        icon = self._resolve_icon(choice)
         try:
             self.setWindowIcon(icon)
         except Exception:
@@ -187,6 +165,7 @@ class App(QApplication):
     def set_start_on_boot(self, enabled: bool):
         """Enable or disable Windows startup by writing/removing Run key in HKCU."""
         try:
+            import winreg
             key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
             name = APP_NAME
             if enabled:
@@ -0,0 +1,51 @@
+import random, time
+
+
+class FetchBackoff:
+    """
+    拉取失败的重试策略
+    - 连续失败时按指数退避（base * 2^(n-1)，上限 cap 秒），并加入随机抖动
+    - 连续失败达到 threshold 次后熔断：停止常规轮询，每 probe_interval 秒试探一次
+    - 任意一次成功即恢复正常轮询
+    """
+    def __init__(self, base=2.0, cap=60.0, threshold=5, probe_interval=30.0, rng=random.random):
+        self.base = float(base)
+        self.cap = float(cap)
+        self.threshold = max(1, int(threshold))
+        self.probe_interval = float(probe_interval)
+        self._rng = rng
+        self.failures = 0             # 连续失败次数
+        self.next_allowed = 0.0       # 下次允许请求的时间（monotonic）
+        self.last_success = None      # 上次成功的时间（time.time）
+
+    @property
+    def is_open(self) -> bool:
+        """熔断器是否处于打开状态"""
+        return self.failures >= self.threshold
+
+    def allow(self, now=None) -> bool:
+        now = time.monotonic() if now is None else now
+        return now >= self.next_allowed
+
+    def record_success(self):
+        self.failures = 0
+        self.next_allowed = 0.0
+        self.last_success = time.time()
+
+    def record_failure(self, now=None) -> float:
+        """记录一次失败，返回距下次允许请求的秒数"""
+        now = time.monotonic() if now is None else now
+        self.failures += 1
+        if self.is_open:
+            delay = self.probe_interval
+        else:
+            delay = min(self.cap, self.base * (2 ** (self.failures - 1)))
+        # 抖动：在 [delay/2, delay] 之间随机，避免多个实例同时重试
+        delay = delay * (0.5 + 0.5 * self._rng())
+        self.next_allowed = now + delay
+        return delay
+
+    def seconds_since_success(self):
+        if self.last_success is None:
+            return None
+        return max(0.0, time.time() - self.last_success)
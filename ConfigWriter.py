@@ -0,0 +1,97 @@
+import json, os, threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, QTimer
+
+
+def write_atomic_bytes(path: str, data: bytes):
+    """写临时文件后替换，避免写到一半时退出留下损坏的文件"""
+    d = os.path.dirname(path)
+    if d and not os.path.exists(d):
+        os.makedirs(d, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_atomic(path: str, text: str):
+    write_atomic_bytes(path, text.encode("utf-8"))
+
+
+class ConfigWriter(QObject):
+    """
+    配置文件的防抖后台写入
+    - schedule()：设置变化时调用，只（重新）启动 delay_ms 定时器；拖动滑块等连续修改合并为一次
+    - 到期后调用 get_config() 序列化；内容与上次写入（或已提交写入）相同则跳过，不同则交给后台线程写盘
+    - 写盘失败时清除记录的内容，下次 schedule()/flush() 会重新写入
+    - flush()：立即同步写入（退出前调用）
+    """
+    def __init__(self, path: str, get_config, delay_ms=500, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._get_config = get_config
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ConfigWriter")
+        self._lock = threading.Lock()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(int(delay_ms))
+        self._timer.timeout.connect(self._write_pending)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._last_text = f.read()
+        except OSError:
+            self._last_text = None
+        self.requests = 0   # schedule() 调用次数
+        self.writes = 0     # 实际写盘次数
+        self.unchanged = 0  # 内容未变而跳过的次数
+        self.errors = 0
+
+    def schedule(self):
+        self.requests += 1
+        self._timer.start()
+
+    def _serialize(self):
+        return json.dumps(self._get_config(), ensure_ascii=False, indent=2)
+
+    def _write_pending(self):
+        try:
+            text = self._serialize()
+        except Exception:
+            self.errors += 1
+            return
+        with self._lock:
+            if text == self._last_text:
+                self.unchanged += 1
+                return
+            self._last_text = text
+        self._executor.submit(self._write, text)
+
+    def _write(self, text):
+        try:
+            write_atomic(self.path, text)
+            with self._lock:
+                self.writes += 1
+        except OSError:
+            with self._lock:
+                self.errors += 1
+                if self._last_text == text:
+                    self._last_text = None
+
+    def flush(self):
+        """取消等待中的定时写入，立即写入当前配置并等待完成"""
+        self._timer.stop()
+        self._write_pending()
+        self._executor.submit(lambda: None).result()   # 单线程按序执行：等待之前提交的写入完成
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def avoided(self) -> int:
+        """相比每次修改都写盘，省掉的写入次数"""
+        return max(0, self.requests - self.writes)
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "writes": self.writes, "unchanged": self.unchanged,
+                "avoided": self.avoided(), "errors": self.errors}
@@ -1,106 +1,279 @@
-from PySide6.QtCore import Qt, QRect, QAbstractTableModel, QModelIndex
-from PySide6.QtGui import QColor, QPainter, QPen, QBrush
-from PySide6.QtWidgets import QStyledItemDelegate
+import time
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QRect, QSize, QPointF, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QColor, QPainter, QPen, QBrush, QPixmap, QPainterPath
+from PySide6.QtWidgets import QStyledItemDelegate, QTableView
 
 # ----- 颜色配置 -----
 UP_COLOR = QColor("#dd2100")
 DOWN_COLOR = QColor("#019933")
 NEUTRAL_COLOR = QColor("#494949")
 
+# 列标题 -> Quote 上对应的颜色符号属性（1 红 / 0 中性 / -1 绿）
+SIGN_ATTRS = {
+    "现价": "sign_delta",
+    "涨跌值": "sign_delta",
+    "涨跌幅": "sign_delta",
+    "委比": "sign_commi",
+    "均价": "sign_avg",
+    "买一": "sign_b1",
+    "卖一": "sign_s1",
+}
+
+# 角色取整数常量：PySide6 每次访问 Qt.XxxRole 枚举属性都有可观开销，data() 中只做整数比较
+_DISPLAY_ROLE = int(Qt.DisplayRole)
+_FOREGROUND_ROLE = int(Qt.ForegroundRole)
+_ALIGNMENT_ROLE = int(Qt.TextAlignmentRole)
+_USER_ROLE = int(Qt.UserRole)
+
 class SimpleTableModel(QAbstractTableModel):
     """
     主浮窗表格数据与格式
+    数据到达时按列预先计算每个单元格的显示文本与前景色，data() 只做下标查找
     """
+    ALIGN_RIGHT = Qt.AlignRight | Qt.AlignVCenter
+    ALIGN_LEFT = Qt.AlignLeft | Qt.AlignVCenter
+
     def __init__(self, rows=None, headers=None, align_right_cols=None, parent=None):
         super().__init__(parent)
-        self._rows = rows or []
         self._headers = headers or []
-        self._align_right = align_right_cols or []
+        self._align_right = set(align_right_cols or [])
         self.default_color = False
         self.fg_color = QColor("#FFFFFF")
+        # 列表：每列的对齐方式、颜色符号属性
+        self._col_align = []
+        self._col_sign = []
+        self._build_columns()
+        # 行表：原始单元格、对应 Quote、显示文本、前景色
+        self._rows = []
         self._row_meta = []
+        self._display = []
+        self._fg = []
+        self._set_all_rows(rows or [], [None for _ in (rows or [])])
 
     def set_color_scheme(self, default: bool, fg: QColor):
+        changed = self.default_color != bool(default) or self.fg_color != QColor(fg)
         self.default_color = bool(default)
         self.fg_color = QColor(fg)
+        if changed:
+            self._fg = [self._row_fg(q) for q in self._row_meta]
+            self._emit_all_changed()
 
     def rowCount(self, parent=QModelIndex()):
-        return len(self._rows)
+        return 0 if parent.isValid() else len(self._rows)
     
     def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
         return len(self._rows[0]) if self._rows else len(self._headers)
 
-    def data(self, index, role=Qt.DisplayRole):
+    def data(self, index, role=_DISPLAY_ROLE):
         if not index.isValid():
             return None
         r, c = index.row(), index.column()
-        cell = "" if c >= len(self._rows[r]) else self._rows[r][c]
-
-        if role == Qt.UserRole:
-            if isinstance(cell, dict) and "k" in cell:
-                return cell["k"]
+        if c >= len(self._col_align):
             return None
 
-        if role == Qt.DisplayRole:
-            return "" if isinstance(cell, dict) else str(cell)
-
-        if role == Qt.TextAlignmentRole:
-            return (Qt.AlignRight | Qt.AlignVCenter) if c in self._align_right else (Qt.AlignLeft | Qt.AlignVCenter)
-
-        if role == Qt.ForegroundRole:
-            if not self.default_color:
-                return self.fg_color
-
-            meta = self._row_meta[r] if 0 <= r < len(self._row_meta) else {}
-            header = self._headers[c] if 0 <= c < len(self._headers) else ""
-            sign = 0
-            if header in ("涨跌值", "涨跌幅", "现价"):
-                sign = int(meta.get("delta", 0))
-            elif header == "委比":
-                sign = int(meta.get("commi", 0))
-            elif header == "均价":
-                sign = int(meta.get("avg", 0))
-            elif header == "买一":
-                sign = int(meta.get("b1", 0))
-            elif header == "卖一":
-                sign = int(meta.get("s1", 0))
-            else:
-                return self.fg_color
+        if role == _DISPLAY_ROLE:
+            return self._display[r][c]
+
+        if role == _FOREGROUND_ROLE:
+            return self._fg[r][c]
 
-            if sign > 0:
-                return UP_COLOR
-            if sign < 0:
-                return DOWN_COLOR
-            return NEUTRAL_COLOR
+        if role == _ALIGNMENT_ROLE:
+            return self._col_align[c]
+
+        if role == _USER_ROLE:
+            # K线 列：(今开, 现价, 最高, 最低, 昨收)
+            cell = self._rows[r][c]
+            return cell if isinstance(cell, tuple) else None
 
         return None
 
+    def cell(self, r: int, c: int):
+        """原始单元格（供委托直接读取 Python 对象，不经 QVariant 转换）"""
+        if 0 <= r < len(self._rows) and 0 <= c < len(self._rows[r]):
+            return self._rows[r][c]
+        return None
+
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self._headers):
             return self._headers[section]
         return None
 
+    # ----- 预计算 -----
+    def _build_columns(self):
+        n = len(self._headers)
+        self._col_align = [self.ALIGN_RIGHT if c in self._align_right else self.ALIGN_LEFT for c in range(n)]
+        self._col_sign = [SIGN_ATTRS.get(h) for h in self._headers]
+
+    @staticmethod
+    def _row_display(row):
+        return [cell if isinstance(cell, str) else ("" if isinstance(cell, tuple) or cell is None else str(cell)) for cell in row]
+
+    def _row_fg(self, quote):
+        fg = self.fg_color
+        if not self.default_color:
+            return [fg] * len(self._col_sign)
+        out = []
+        for attr in self._col_sign:
+            if attr is None:
+                out.append(fg)
+                continue
+            sign = getattr(quote, attr, 0)
+            out.append(UP_COLOR if sign > 0 else (DOWN_COLOR if sign < 0 else NEUTRAL_COLOR))
+        return out
+
+    def _set_all_rows(self, rows, meta):
+        self._rows = list(rows)
+        self._row_meta = meta
+        self._display = [self._row_display(row) for row in self._rows]
+        self._fg = [self._row_fg(q) for q in meta]
+
     def set_rows_headers(self, rows, headers, meta=None):
-        self.beginResetModel()
-        self._rows = rows or []
-        self._headers = headers or []
-        self._row_meta = list(meta or [{} for _ in self._rows])
-        self.endResetModel()
+        """
+        更新表格数据
+        列集合变化（或行无法按代码对应）时整体重置；否则按代码对比新旧行：
+        删除/移动/插入行，并只对值或颜色符号变化的单元格发出 dataChanged
+        """
+        rows = rows or []
+        headers = headers or []
+        meta = list(meta or [None for _ in rows])   # 每行对应的 Quote
+        new_keys = [getattr(m, "code", None) for m in meta]
+        old_keys = [getattr(m, "code", None) for m in self._row_meta]
+        if (headers != self._headers or not self._rows or len(meta) != len(rows)
+                or len(old_keys) != len(self._rows) or None in new_keys or None in old_keys
+                or len(set(new_keys)) != len(new_keys) or len(set(old_keys)) != len(old_keys)):
+            self.beginResetModel()
+            self._headers = headers
+            self._build_columns()
+            self._set_all_rows(rows, meta)
+            self.endResetModel()
+            return
+
+        self._sync_rows(old_keys, new_keys)
+
+        # 逐行比较：显示文本与颜色符号；只为变化的行重新计算角色数据
+        sign_attrs = self._col_sign
+        for r, (new_row, new_q) in enumerate(zip(rows, meta)):
+            old_row, old_q = self._rows[r], self._row_meta[r]
+            if old_row is new_row and old_q is new_q:
+                continue
+            self._rows[r] = new_row
+            self._row_meta[r] = new_q
+            self._display[r] = self._row_display(new_row)
+            self._fg[r] = self._row_fg(new_q)
+            if old_q is None:
+                continue   # 新插入的行已由 rowsInserted 通知
+            first = last = -1
+            for c, attr in enumerate(sign_attrs):
+                if (old_row[c] != new_row[c]
+                        or (attr is not None and getattr(old_q, attr, 0) != getattr(new_q, attr, 0))):
+                    if first < 0:
+                        first = c
+                    last = c
+            if first >= 0:
+                self.dataChanged.emit(self.index(r, first), self.index(r, last))
+
+    def _row_tables(self):
+        return (self._rows, self._row_meta, self._display, self._fg)
+
+    def _sync_rows(self, old_keys, new_keys):
+        """按代码把现有行调整为新的顺序：先删除，再移动，最后插入（新行内容由调用方随后写入）"""
+        new_set = set(new_keys)
+        # 删除：从后往前，连续的行合并为一次
+        r = len(old_keys) - 1
+        while r >= 0:
+            if old_keys[r] in new_set:
+                r -= 1
+                continue
+            end = r
+            while r - 1 >= 0 and old_keys[r - 1] not in new_set:
+                r -= 1
+            self.beginRemoveRows(QModelIndex(), r, end)
+            for t in self._row_tables():
+                del t[r:end + 1]
+            del old_keys[r:end + 1]
+            self.endRemoveRows()
+            r -= 1
+
+        # 移动：保留下来的行按新顺序就位
+        old_set = set(old_keys)
+        target = [k for k in new_keys if k in old_set]
+        for i, k in enumerate(target):
+            if old_keys[i] == k:
+                continue
+            j = old_keys.index(k, i + 1)
+            self.beginMoveRows(QModelIndex(), j, j, QModelIndex(), i)
+            for t in self._row_tables():
+                t.insert(i, t.pop(j))
+            old_keys.insert(i, old_keys.pop(j))
+            self.endMoveRows()
+
+        # 插入：新增代码按目标位置插入占位行，连续的行合并为一次
+        r = 0
+        n = len(new_keys)
+        ncol = len(self._headers)
+        while r < n:
+            if new_keys[r] in old_set:
+                r += 1
+                continue
+            start = r
+            while r + 1 < n and new_keys[r + 1] not in old_set:
+                r += 1
+            self.beginInsertRows(QModelIndex(), start, r)
+            cnt = r - start + 1
+            self._rows[start:start] = [[""] * ncol for _ in range(cnt)]
+            self._row_meta[start:start] = [None] * cnt
+            self._display[start:start] = [[""] * ncol for _ in range(cnt)]
+            self._fg[start:start] = [[self.fg_color] * ncol for _ in range(cnt)]
+            self.endInsertRows()
+            r += 1
+
+    def _emit_all_changed(self):
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, self.columnCount() - 1))
 
     def set_align_right_cols(self, cols_idx):
-        self._align_right = set(cols_idx or [])
+        cols = set(cols_idx or [])
+        if cols != self._align_right:
+            self._align_right = cols
+            self._build_columns()
+            self._emit_all_changed()
+
+
+class TimedTableView(QTableView):
+    """设置了 perf 时记录整个表格每次重绘的耗时"""
+    perf = None
+
+    def paintEvent(self, event):
+        perf = self.perf
+        if perf is None or not perf.enabled:
+            super().paintEvent(event)
+            return
+        t = time.perf_counter()
+        super().paintEvent(event)
+        perf.add("paint", time.perf_counter() - t)
 
 
 class KLineDelegate(QStyledItemDelegate):
     """
     当日K线图，基于昨收，今开，最高，最低，实时价
+    绘制结果按 (量化后的价格, 单元格尺寸, 缩放, 颜色, 设备像素比) 缓存为 QPixmap（LRU），重绘时直接贴图
     """
+    CACHE_MAX = 512
+    perf = None   # Perf.PerfStats：记录每个单元格的绘制耗时
+
     def __init__(self, parent=None, base_pt=12):
         super().__init__(parent)
         self.default_color = False
         self.fg = QColor("#FFFFFF")
         self.base_pt = max(1, int(base_pt))
         self.scale = 1.0  # 缩放
+        self._pixmaps = OrderedDict()
+        self.hits = 0
+        self.misses = 0
 
     def update_scheme(self, default_color: bool, fg: QColor):
         self.default_color = bool(default_color)
@@ -109,16 +282,52 @@ class KLineDelegate(QStyledItemDelegate):
     def set_point_size(self, pt: int):
         self.scale = max(0.5, min(1.5, float(pt) / float(self.base_pt)))
 
+    def clear_cache(self):
+        self._pixmaps.clear()
+
     def paint(self, painter: QPainter, option, index):
+        perf = self.perf
+        if perf is None or not perf.enabled:
+            self._paint(painter, option, index)
+            return
+        t = time.perf_counter()
+        self._paint(painter, option, index)
+        perf.add("paint.kline", time.perf_counter() - t)
+
+    def _paint(self, painter: QPainter, option, index):
         k = index.data(Qt.UserRole)
         if not k or not isinstance(k, tuple) or len(k) != 5:
             super().paint(painter, option, index)
             return
 
+        cell = option.rect
+        if cell.width() <= 0 or cell.height() <= 0:
+            return
+        dev = painter.device()
+        dpr = dev.devicePixelRatioF() if dev is not None else 1.0
+        key = (tuple(round(v, 4) for v in k), cell.width(), cell.height(), self.scale,
+               self.default_color, self.fg.rgba(), dpr)
+        pm = self._pixmaps.get(key)
+        if pm is not None:
+            self._pixmaps.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            pm = QPixmap(max(1, round(cell.width() * dpr)), max(1, round(cell.height() * dpr)))
+            pm.setDevicePixelRatio(dpr)
+            pm.fill(Qt.transparent)
+            p = QPainter(pm)
+            self._draw(p, QRect(0, 0, cell.width(), cell.height()), k)
+            p.end()
+            self._pixmaps[key] = pm
+            if len(self._pixmaps) > self.CACHE_MAX:
+                self._pixmaps.popitem(last=False)
+        painter.drawPixmap(cell.topLeft(), pm)
+
+    def _draw(self, painter: QPainter, cell: QRect, k):
         o, c, h, l, p = k
         if h < l: h, l = l, h
 
-        cell = option.rect
         rect = cell.adjusted(2, 2, -2, -2)
 
         sc = max(0.5, min(1.5, self.scale))
@@ -178,4 +387,111 @@ class KLineDelegate(QStyledItemDelegate):
             # 填充实体（空阳线）
             painter.fillRect(body_x, top, body_w, body_h, QBrush(kcolor))
 
-        painter.restore()
\ No newline at end of file
+        painter.restore()
+
+
+class SparklineDelegate(QStyledItemDelegate):
+    """
+    分时走势线，数据来自 TickHistory 的环形缓冲区（单元格为 Spark）
+    每只股票缓存一条 QPainterPath，仅在缓冲区版本或单元格尺寸变化时重建；点数不超过像素宽度
+    """
+    CACHE_MAX = 1024
+    BASE_WIDTH = 60
+    perf = None
+
+    def __init__(self, parent=None, base_pt=12):
+        super().__init__(parent)
+        self.default_color = False
+        self.fg = QColor("#FFFFFF")
+        self.base_pt = max(1, int(base_pt))
+        self.scale = 1.0  # 缩放
+        self._paths = OrderedDict()   # code -> (key, path, 昨收线 y, 颜色符号)
+
+    def update_scheme(self, default_color: bool, fg: QColor):
+        self.default_color = bool(default_color)
+        self.fg = QColor(fg)
+
+    def set_point_size(self, pt: int):
+        self.scale = max(0.5, min(1.5, float(pt) / float(self.base_pt)))
+
+    def clear_cache(self):
+        self._paths.clear()
+
+    def sizeHint(self, option, index):
+        hint = super().sizeHint(option, index)
+        return QSize(int(self.BASE_WIDTH * self.scale), hint.height())
+
+    def paint(self, painter: QPainter, option, index):
+        perf = self.perf
+        if perf is None or not perf.enabled:
+            self._paint(painter, option, index)
+            return
+        t = time.perf_counter()
+        self._paint(painter, option, index)
+        perf.add("paint.spark", time.perf_counter() - t)
+
+    def _paint(self, painter: QPainter, option, index):
+        model = index.model()
+        spark = model.cell(index.row(), index.column()) if hasattr(model, "cell") else None
+        ring = getattr(spark, "ring", None)
+        if ring is None or len(ring) < 2:
+            return
+
+        rect = option.rect.adjusted(2, 3, -2, -3)
+        if rect.width() < 2 or rect.height() < 2:
+            return
+        key = (spark.version, rect.width(), rect.height(), spark.prev_close)
+        entry = self._paths.get(spark.code)
+        if entry is None or entry[0] != key:
+            entry = self._build(spark, ring, rect.width(), rect.height(), key)
+            self._paths[spark.code] = entry
+            if len(self._paths) > self.CACHE_MAX:
+                self._paths.popitem(last=False)
+        else:
+            self._paths.move_to_end(spark.code)
+        _, path, y_prev, sign = entry
+
+        color = self.fg
+        if self.default_color:
+            color = UP_COLOR if sign > 0 else (DOWN_COLOR if sign < 0 else NEUTRAL_COLOR)
+
+        painter.save()
+        painter.setClipRect(option.rect)
+        painter.translate(rect.topLeft())
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        if y_prev is not None:
+            # 昨收虚线
+            dash_col = QColor(NEUTRAL_COLOR if self.default_color else self.fg)
+            dash_col.setAlpha(120)
+            painter.setPen(QPen(dash_col, 1, Qt.DashLine))
+            painter.drawLine(QPointF(0, y_prev), QPointF(rect.width(), y_prev))
+        painter.setPen(QPen(color, 1))
+        painter.drawPath(path)
+        painter.restore()
+
+    @staticmethod
+    def _build(spark, ring, w, h, key):
+        prices = ring.prices()
+        n = len(prices)
+        # 降采样：每个像素列取该区间最后一个价格
+        if n > w:
+            step = n / w
+            prices = [prices[min(n - 1, int((i + 1) * step) - 1)] for i in range(w)]
+            n = w
+        prev = spark.prev_close
+        lo, hi = min(prices), max(prices)
+        if prev > 0:
+            lo, hi = min(lo, prev), max(hi, prev)
+        span = hi - lo
+
+        def y_for(v):
+            return h / 2 if span <= 0 else (hi - v) / span * (h - 1)
+
+        dx = (w - 1) / (n - 1)
+        path = QPainterPath()
+        path.moveTo(0, y_for(prices[0]))
+        for i in range(1, n):
+            path.lineTo(i * dx, y_for(prices[i]))
+        last = prices[-1]
+        sign = 0 if prev <= 0 else ((last > prev) - (last < prev))
+        return key, path, (y_for(prev) if prev > 0 else None), sign
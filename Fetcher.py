@@ -0,0 +1,128 @@
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+
+
+class _FetchWorker(QObject):
+    """
+    运行在后台线程中的拉取任务：执行 HTTP 请求与解析
+    """
+    finished = Signal(int, object)  # seq, result
+    failed = Signal(int, object)    # seq, exception
+
+    def __init__(self, fetch_fn):
+        super().__init__()
+        self._fetch_fn = fetch_fn
+
+    @Slot(int, object)
+    def run(self, seq, codes):
+        try:
+            result = self._fetch_fn(codes)
+        except Exception as e:
+            self.failed.emit(seq, e)
+            return
+        self.finished.emit(seq, result)
+
+
+class QuoteFetcher(QObject):
+    """
+    后台行情拉取器
+    - 在独立 QThread 中调用 fetch_fn(codes)，结果通过排队信号回到 GUI 线程
+    - 同一时间最多一个请求在途；在途期间 request() 的新请求合并为一次
+    - request_batches() 的各批（自适应刷新的快/中/慢档）在队列中保持为独立请求，依次发出
+    - invalidate() 之后，在途请求的结果视为过期并丢弃
+    """
+    data_ready = Signal(object, object)     # codes, result
+    fetch_failed = Signal(object, object)   # codes, exception
+    _request = Signal(int, object)
+
+    def __init__(self, fetch_fn, parent=None):
+        super().__init__(parent)
+        self._seq = 0
+        self._generation = 0
+        self._inflight = None   # (seq, generation, codes)
+        self._pending = []      # 在途期间排队的 [codes, 可合并]
+
+        self._thread = QThread()
+        self._thread.setObjectName("QuoteFetcher")
+        self._worker = _FetchWorker(fetch_fn)
+        self._worker.moveToThread(self._thread)
+        self._request.connect(self._worker.run)
+        self._worker.finished.connect(self._on_finished)
+        self._worker.failed.connect(self._on_failed)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._thread.start()
+
+    def is_busy(self) -> bool:
+        return self._inflight is not None
+
+    def request(self, codes):
+        """请求一次拉取；若已有请求在途，则与已排队的请求合并后排队"""
+        codes = list(codes or [])
+        if self._inflight is not None:
+            if self._pending and self._pending[-1][1]:
+                self._pending[-1][0] = list(dict.fromkeys(self._pending[-1][0] + codes))
+            else:
+                self._pending.append([codes, True])
+            return False
+        self._start(codes)
+        return True
+
+    def request_batches(self, batches):
+        """按批请求，每批单独一次拉取（不与其它请求合并）；已在队列中的代码不重复排队"""
+        queued = {c for codes, _ in self._pending for c in codes}
+        for codes in batches:
+            codes = [c for c in codes if c not in queued]
+            if not codes:
+                continue
+            queued.update(codes)
+            if self._inflight is None:
+                self._start(codes)
+            else:
+                self._pending.append([codes, False])
+
+    def invalidate(self):
+        """自选列表变化：丢弃在途请求的结果及排队请求"""
+        self._generation += 1
+        self._pending = []
+
+    def stop(self, timeout_ms: int = 4000):
+        self._pending = []
+        self._thread.quit()
+        self._thread.wait(timeout_ms)
+
+    def _start(self, codes):
+        self._seq += 1
+        self._inflight = (self._seq, self._generation, codes)
+        self._request.emit(self._seq, codes)
+
+    def _take_inflight(self, seq):
+        # 返回 (codes, 是否过期)；seq 不匹配时返回 None
+        if self._inflight is None or self._inflight[0] != seq:
+            return None
+        _, generation, codes = self._inflight
+        self._inflight = None
+        return codes, generation != self._generation
+
+    def _start_pending(self):
+        if self._pending and self._inflight is None:
+            codes, _ = self._pending.pop(0)
+            self._start(codes)
+
+    @Slot(int, object)
+    def _on_finished(self, seq, result):
+        taken = self._take_inflight(seq)
+        if taken is None:
+            return
+        codes, stale = taken
+        if not stale:
+            self.data_ready.emit(codes, result)
+        self._start_pending()
+
+    @Slot(int, object)
+    def _on_failed(self, seq, error):
+        taken = self._take_inflight(seq)
+        if taken is None:
+            return
+        codes, stale = taken
+        if not stale:
+            self.fetch_failed.emit(codes, error)
+        self._start_pending()
@@ -0,0 +1,94 @@
+from datetime import datetime, time, timedelta, timezone
+
+# ----- 交易时段（北京时间 / 香港时间，均为 UTC+8，无夏令时） -----
+MARKET_TZ = timezone(timedelta(hours=8))
+
+# 沪深京：集合竞价 / 连续竞价 / 午间休市 / 收盘集合竞价
+CN_SESSIONS = [
+    (time(9, 15),  time(9, 25),  "call_auction"),
+    (time(9, 25),  time(9, 30),  "pre_open"),        # 竞价撮合完成，等待开盘，行情不变
+    (time(9, 30),  time(11, 30), "continuous"),
+    (time(11, 30), time(13, 0),  "lunch_break"),
+    (time(13, 0),  time(14, 57), "continuous"),
+    (time(14, 57), time(15, 0),  "closing_auction"),
+]
+
+# 港股：开市前时段 / 持续交易 / 午间休市 / 收市竞价
+HK_SESSIONS = [
+    (time(9, 0),   time(9, 20),  "call_auction"),
+    (time(9, 20),  time(9, 30),  "pre_open"),
+    (time(9, 30),  time(12, 0),  "continuous"),
+    (time(12, 0),  time(13, 0),  "lunch_break"),
+    (time(13, 0),  time(16, 0),  "continuous"),
+    (time(16, 0),  time(16, 10), "closing_auction"),
+]
+
+SESSIONS = {"cn": CN_SESSIONS, "hk": HK_SESSIONS}
+ACTIVE_PHASES = ("call_auction", "continuous", "closing_auction")
+
+
+def market_of(code: str) -> str:
+    """按代码前缀判断市场：hk → 港股，sh/sz/bj → 沪深京"""
+    return "hk" if str(code).lower().startswith("hk") else "cn"
+
+
+def market_now() -> datetime:
+    return datetime.now(MARKET_TZ)
+
+
+def phase(market: str, now: datetime) -> str:
+    """返回市场在 now 时刻所处的交易阶段，周末及非交易时段为 'closed'"""
+    if now.weekday() >= 5:
+        return "closed"
+    t = now.time()
+    for start, end, name in SESSIONS.get(market, CN_SESSIONS):
+        if start <= t < end:
+            return name
+    return "closed"
+
+
+def is_active(code: str, now: datetime = None) -> bool:
+    """代码所属市场当前是否处于竞价或连续交易阶段"""
+    return phase(market_of(code), now or market_now()) in ACTIVE_PHASES
+
+
+class MarketScheduler:
+    """
+    按市场交易时段决定每次定时刷新需要拉取的代码
+    - 市场处于竞价/连续交易阶段：全速刷新
+    - 午休、收盘、周末：不刷新；离开交易阶段后延迟 final_delay 秒补拉一次收盘数据
+    - 首次调用时所有市场都拉取一次
+    """
+    def __init__(self, final_delay: int = 30):
+        self.final_delay = timedelta(seconds=max(0, int(final_delay)))
+        self._last_phase = {}   # market -> 上次检查时的阶段
+        self._final_at = {}     # market -> 待执行的收盘补拉时间
+
+    def reset(self):
+        self._last_phase.clear()
+        self._final_at.clear()
+
+    def due_markets(self, markets, now: datetime = None) -> set:
+        now = now or market_now()
+        due = set()
+        for m in markets:
+            ph = phase(m, now)
+            prev = self._last_phase.get(m)
+            self._last_phase[m] = ph
+            if ph in ACTIVE_PHASES:
+                self._final_at.pop(m, None)
+                due.add(m)
+            elif prev is None:
+                due.add(m)
+            elif prev in ACTIVE_PHASES:
+                self._final_at[m] = now + self.final_delay
+            at = self._final_at.get(m)
+            if at is not None and now >= at:
+                self._final_at.pop(m, None)
+                due.add(m)
+        return due
+
+    def due_codes(self, codes, now: datetime = None) -> list:
+        markets = {market_of(c) for c in codes}
+        due = self.due_markets(markets, now)
+        return [c for c in codes if market_of(c) in due]
@@ -0,0 +1,58 @@
+# ----- 分页轮播 -----
+
+
+class Pager:
+    """
+    自选股很多时分页显示：每页固定 page_size 行，定时或滚轮翻页
+    - 最后一页向前补齐到 page_size 行，各页行数相同，浮窗尺寸不随翻页变化
+    - 当前页每个刷新周期拉取；其它页每 background_every 个周期拉取一页（轮流），
+      每次请求的代码数不超过两页，与自选总数无关
+    """
+    def __init__(self, page_size=0, background_every=10):
+        self.page_size = max(0, int(page_size))
+        self.background_every = max(1, int(background_every))
+        self.page = 0
+        self._tick = 0
+        self._bg_page = 0
+
+    def enabled(self, codes) -> bool:
+        return 0 < self.page_size < len(codes)
+
+    def page_count(self, codes) -> int:
+        if not self.enabled(codes):
+            return 1
+        return -(-len(codes) // self.page_size)
+
+    def _slice(self, codes, page):
+        start = min(page * self.page_size, len(codes) - self.page_size)
+        return codes[start:start + self.page_size]
+
+    def visible(self, codes) -> list:
+        """当前页的代码；未分页时为全部"""
+        if not self.enabled(codes):
+            return list(codes)
+        self.page %= self.page_count(codes)
+        return self._slice(codes, self.page)
+
+    def turn(self, codes, step=1) -> bool:
+        """翻页（step 可为负）；返回页码是否变化"""
+        n = self.page_count(codes)
+        if n <= 1:
+            return False
+        self.page = (self.page + step) % n
+        return True
+
+    def due(self, codes) -> list:
+        """推进一个刷新周期，返回本周期应拉取的代码：当前页 + 到期时轮到的一个后台页"""
+        if not self.enabled(codes):
+            return list(codes)
+        visible = self.visible(codes)
+        self._tick += 1
+        if self._tick % self.background_every:
+            return visible
+        n = self.page_count(codes)
+        self._bg_page = (self._bg_page + 1) % n
+        if self._bg_page == self.page:
+            self._bg_page = (self._bg_page + 1) % n
+        seen = set(visible)
+        return visible + [c for c in self._slice(codes, self._bg_page) if c not in seen]
@@ -0,0 +1,105 @@
+import json, threading, time
+from collections import deque
+
+# ----- 热路径计时 -----
+# 每个环节（span）保留最近 window 个耗时样本，滚动计算 p50/p95/max
+# 关闭时 span() 返回共享的空上下文，开销只有一次属性判断
+
+# 浮窗提示中的显示顺序；未列出的 span 排在后面
+SPAN_ORDER = ("fetch", "fetch.connect", "fetch.headers", "fetch.transfer", "parse",
+              "project", "model", "fit", "paint", "paint.kline", "paint.spark")
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_perf", "_name", "_t")
+
+    def __init__(self, perf, name):
+        self._perf = perf
+        self._name = name
+
+    def __enter__(self):
+        self._t = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._perf.add(self._name, time.perf_counter() - self._t)
+        return False
+
+
+def percentile(sorted_vals, p):
+    """已排序样本的第 p 百分位（最近秩）；空列表返回 0"""
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(round(p / 100 * (len(sorted_vals) - 1))))]
+
+
+class PerfStats:
+    """
+    各环节耗时统计；后台拉取线程与主线程都会写入，add() 加锁
+        with perf.span("parse"): ...
+        perf.add("fetch.headers", seconds)
+    """
+    def __init__(self, enabled=False, window=500):
+        self.enabled = bool(enabled)
+        self.window = max(10, int(window))
+        self._lock = threading.Lock()
+        self._samples = {}   # name -> deque[秒]
+        self._counts = {}    # name -> 累计次数
+
+    def span(self, name):
+        return _Span(self, name) if self.enabled else _NULL
+
+    def add(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            d = self._samples.get(name)
+            if d is None:
+                d = self._samples[name] = deque(maxlen=self.window)
+                self._counts[name] = 0
+            d.append(seconds)
+            self._counts[name] += 1
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def summary(self) -> dict:
+        """{span: {"n": 累计次数, "p50_ms", "p95_ms", "max_ms"}}（最近 window 个样本）"""
+        with self._lock:
+            items = [(k, sorted(v), self._counts[k]) for k, v in self._samples.items() if v]
+        rank = {k: i for i, k in enumerate(SPAN_ORDER)}
+        items.sort(key=lambda it: (rank.get(it[0], len(rank)), it[0]))
+        return {k: {"n": n, "p50_ms": round(percentile(v, 50) * 1e3, 3), "p95_ms": round(percentile(v, 95) * 1e3, 3),
+                    "max_ms": round(v[-1] * 1e3, 3)} for k, v, n in items}
+
+    def text(self) -> str:
+        lines = ["耗时 p50 / p95 / max（毫秒）"]
+        for k, s in self.summary().items():
+            lines.append(f"{k}: {s['p50_ms']:.2f} / {s['p95_ms']:.2f} / {s['max_ms']:.2f}")
+        return "\n".join(lines) if len(lines) > 1 else ""
+
+    def export_jsonl(self, path: str) -> int:
+        """追加当前统计，每个 span 一行 JSON；返回写入行数"""
+        summary = self.summary()
+        if not summary:
+            return 0
+        ts = round(time.time(), 3)
+        with open(path, "a", encoding="utf-8") as f:
+            for k, s in summary.items():
+                f.write(json.dumps({"ts": ts, "span": k, **s}, ensure_ascii=False) + "\n")
+        return len(summary)
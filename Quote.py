@@ -0,0 +1,202 @@
+from collections import namedtuple
+
+# ----- 行情记录与显示格式 -----
+# Quote 只保存数值（含五档盘口）及派生指标；显示字符串在投影时按列按需生成
+
+
+def _sign(v) -> int:
+    return (v > 0) - (v < 0)
+
+
+class Quote:
+    """
+    单只股票一次轮询的行情（__slots__，无逐行字典）
+    原始字段：今开/昨收/现价/最高/最低、买一卖一价、成交量/额、五档盘口、交易所日期时间
+    派生字段：有效现价 last、K 线四价、涨跌、涨跌幅、均价、委比、集合竞价未配对量及颜色符号
+    """
+    __slots__ = (
+        "code", "name", "is_hk", "etf",
+        "open", "prev_close", "price", "high", "low",
+        "bid1", "ask1", "volume", "amount",
+        "bid_vols", "bid_prices", "ask_vols", "ask_prices",
+        "date", "time",
+        "last", "k_open", "k_high", "k_low",
+        "auction", "unpaired", "change", "change_pct", "avg", "committee",
+        "sign_delta", "sign_commi", "sign_avg", "sign_b1", "sign_s1",
+    )
+
+    def __init__(self, code, name, is_hk, open, prev_close, price, high, low, bid1, ask1, volume, amount,
+                 bid_vols, bid_prices, ask_vols, ask_prices, date, time):
+        self.code = code
+        self.name = name
+        self.is_hk = is_hk
+        self.etf = (not is_hk) and code[2] in ('1', '5')   # 港股暂不区分ETF
+        self.open = open
+        self.prev_close = prev_close
+        self.price = price
+        self.high = high
+        self.low = low
+        self.bid1 = bid1
+        self.ask1 = ask1
+        self.volume = volume
+        self.amount = amount
+        self.bid_vols = bid_vols
+        self.bid_prices = bid_prices
+        self.ask_vols = ask_vols
+        self.ask_prices = ask_prices
+        self.date = date
+        self.time = time
+        self._derive()
+
+    def _derive(self):
+        prev = self.prev_close
+        last = self.price
+        # 买一价 == 卖一价 > 0：集合竞价（9:15~9:25；14:57~15:00），现价取虚拟撮合价
+        self.auction = self.bid1 == self.ask1 > 0
+        if self.auction:
+            last = self.ask1
+            # 未配对量：>0 表示买方优势，<0 表示卖方优势
+            self.unpaired = -self.ask_vols[1] if self.ask_vols[1] > 0 else self.bid_vols[1]
+            self.sign_b1 = self.sign_s1 = _sign(self.unpaired)
+        else:
+            # 连续竞价时：买一固定红色，卖一固定绿色
+            self.unpaired = 0
+            self.sign_b1, self.sign_s1 = 1, -1
+        if last == 0:
+            last = prev  # 9:00 ~ 9:15 无数据
+        if self.open == 0:
+            self.k_open = self.k_high = self.k_low = last
+        else:
+            self.k_open, self.k_high, self.k_low = self.open, self.high, self.low
+        self.last = last
+
+        self.change = last - prev if prev else 0.0
+        self.change_pct = (last / prev - 1) * 100 if prev else 0.0
+        self.avg = (self.amount / self.volume) if self.volume > 0 else prev  # 均价
+        p_sum, s_sum = sum(self.bid_vols), sum(self.ask_vols)
+        self.committee = (100 * (p_sum - s_sum) / (p_sum + s_sum)) if (p_sum + s_sum) > 0 else 0.0  # 委比
+        self.sign_delta = _sign(self.change)
+        self.sign_commi = _sign(self.committee)
+        self.sign_avg = (self.avg > prev) - (self.avg < prev)
+
+    @property
+    def kline(self):
+        """(今开, 现价, 最高, 最低, 昨收)，供 KLineDelegate 绘制"""
+        return (self.k_open, self.last, self.k_high, self.k_low, self.prev_close)
+
+    @property
+    def decimals(self) -> int:
+        return 3 if self.etf else 2
+
+    def __repr__(self):
+        return f"Quote({self.code} {self.last} {self.change_pct:+.2f}%)"
+
+
+# ----- 显示格式 -----
+FormatOptions = namedtuple("FormatOptions", ["short_code", "name_length", "b1s1_display"])
+
+
+def _arrow(q: Quote) -> str:
+    # 触及日高/低显示箭头
+    if q.k_high > q.k_low:
+        if q.last == q.k_high:
+            return "↑"
+        if q.last == q.k_low:
+            return "↓"
+    return " "
+
+
+def _fmt_volume(v) -> str:
+    return f"{v}" if v < 1e4 else (f"{v/1e4:.2f}万" if v < 1e8 else f"{v/1e8:.2f}亿")
+
+
+def _fmt_amount(q: Quote) -> str:
+    if q.is_hk:
+        return "-"
+    a = q.amount
+    return f"{a/1e4:.2f}万" if a < 1e8 else (f"{a/1e8:.2f}亿" if a < 1e12 else f"{a/1e12:.2f}万亿")
+
+
+def _at_price(q: Quote, p) -> bool:
+    # 按显示精度比较，避免浮点微小误差
+    return round(q.price, q.decimals) == round(p, q.decimals)
+
+
+def _fmt_b1(q: Quote, o: FormatOptions) -> str:
+    b_price = f"{q.bid1:.{q.decimals}f}"
+    mode = o.b1s1_display
+    if q.auction:
+        # 集合竞价：配对量（不显示成交方向箭头）
+        paired_cnt = int(q.ask_vols[0] / 100)
+        if mode == 'price':
+            return b_price
+        if mode == 'both':
+            return f"{paired_cnt:d}({b_price})"
+        return f"{paired_cnt:d}"
+    # 连续竞价：买一数量，现价等于买一价时右侧标记 '<'
+    marker = "<" if q.bid1 > 0 and _at_price(q, q.bid1) else " "
+    if q.bid1 <= 0:
+        return f"-{marker}"
+    cnt = f"{int(q.bid_vols[0]/100)}"
+    if mode == 'price':
+        return f"{b_price}{marker}"
+    if mode == 'both':
+        return f"{cnt}({b_price}){marker}"
+    return f"{cnt}{marker}"
+
+
+def _fmt_s1(q: Quote, o: FormatOptions) -> str:
+    s_price = f"{q.ask1:.{q.decimals}f}"
+    mode = o.b1s1_display
+    if q.auction:
+        # 集合竞价：未配对量
+        unpaired_cnt = int(q.unpaired / 100)
+        if mode == 'price':
+            return s_price
+        if mode == 'both':
+            return f"{unpaired_cnt:+d}({s_price})"
+        return f"{unpaired_cnt:+d}"
+    # 连续竞价：卖一数量，现价等于卖一价时左侧标记 '>'
+    marker = ">" if q.ask1 > 0 and _at_price(q, q.ask1) else " "
+    if q.ask1 <= 0:
+        return f"{marker}-"
+    cnt = f"{int(q.ask_vols[0]/100)}"
+    if mode == 'price':
+        return f"{marker}{s_price}"
+    if mode == 'both':
+        return f"{marker}{cnt}({s_price})"
+    return f"{marker}{cnt}"
+
+
+# 列标题 -> 格式化函数；港股用2位小数，ETF用3位，普通A股用2位
+COLUMN_FORMATTERS = {
+    "代码":   lambda q, o: q.code[2:] if o.short_code else q.code,
+    "名称":   lambda q, o: q.name if o.name_length == 0 else q.name[:o.name_length],
+    "现价":   lambda q, o: f"{q.last:.{q.decimals}f}{_arrow(q)}",
+    "涨跌值": lambda q, o: f"{q.change:+.{q.decimals}f}",
+    "涨跌幅": lambda q, o: f"{q.change_pct:+.2f}%",
+    "买一":   _fmt_b1,
+    "卖一":   _fmt_s1,
+    "委比":   lambda q, o: f"{q.committee:+.2f}%" if not q.is_hk else "-",
+    "成交量": lambda q, o: _fmt_volume(q.volume),
+    "成交额": lambda q, o: _fmt_amount(q),
+    "均价":   lambda q, o: f"{q.avg:.{q.decimals}f}" if not q.is_hk else "-",
+    "K线":    lambda q, o: q.kline,
+    "分时":   lambda q, o: None,   # 由 FloatLabel 填入 TickHistory.spark(q)
+}
+
+
+def format_row(q: Quote, headers, opts: FormatOptions) -> list:
+    """按列生成一行显示数据；K线 列为 (今开, 现价, 最高, 最低, 昨收) 元组"""
+    if isinstance(q, MissingQuote):
+        return [COLUMN_FORMATTERS["代码"](q, opts) if h == "代码" else ("" if h in ("K线", "分时") else "-")
+                for h in headers]
+    return [COLUMN_FORMATTERS[h](q, opts) for h in headers]
+
+
+class MissingQuote:
+    """占位行：分页时当前页中暂无行情（无效代码或尚未拉取）的代码，保持每页行数不变"""
+    __slots__ = ("code",)
+
+    def __init__(self, code):
+        self.code = code
@@ -0,0 +1,65 @@
+import time
+
+# ----- 自适应刷新分档 -----
+TIER_FAST, TIER_MEDIUM, TIER_SLOW = 0, 1, 2
+TIER_NAMES = {TIER_FAST: "fast", TIER_MEDIUM: "medium", TIER_SLOW: "slow"}
+
+
+class RefreshTiers:
+    """
+    根据每只股票价格/成交量实际变化的频率分为快/中/慢三档
+    - 快档：每个刷新周期拉取
+    - 中档：每 medium_every 个周期拉取一次
+    - 慢档：每 slow_every 个周期拉取一次
+    最近 fast_window 秒内有变化为快档，medium_window 秒内有变化为中档，否则为慢档
+    """
+    def __init__(self, medium_every=5, slow_every=15, fast_window=60, medium_window=300):
+        self.every = {TIER_FAST: 1, TIER_MEDIUM: max(1, int(medium_every)), TIER_SLOW: max(1, int(slow_every))}
+        self.fast_window = float(fast_window)
+        self.medium_window = float(medium_window)
+        self._last_value = {}    # code -> 上次观测到的 (价格, 成交量)
+        self._last_change = {}   # code -> 上次变化的时间（monotonic）
+        self._tick = 0
+
+    def reset(self):
+        self._last_value.clear()
+        self._last_change.clear()
+        self._tick = 0
+
+    def observe(self, code, value, now=None):
+        """记录一次拉取结果；value 为可比较的 (价格, 成交量)"""
+        now = time.monotonic() if now is None else now
+        if self._last_value.get(code) != value:
+            self._last_value[code] = value
+            self._last_change[code] = now
+
+    def forget(self, codes_keep):
+        keep = set(codes_keep)
+        for d in (self._last_value, self._last_change):
+            for c in [c for c in d if c not in keep]:
+                del d[c]
+
+    def tier(self, code, now=None) -> int:
+        last = self._last_change.get(code)
+        if last is None:
+            return TIER_FAST
+        age = (time.monotonic() if now is None else now) - last
+        if age <= self.fast_window:
+            return TIER_FAST
+        if age <= self.medium_window:
+            return TIER_MEDIUM
+        return TIER_SLOW
+
+    def due_batches(self, codes, now=None) -> list:
+        """推进一个刷新周期，返回本周期到期的各档代码（每档一批，快档在前）"""
+        self._tick += 1
+        batches = {t: [] for t in self.every}
+        for c in codes:
+            batches[self.tier(c, now)].append(c)
+        return [batches[t] for t in sorted(batches) if batches[t] and self._tick % self.every[t] == 0]
+
+    def counts(self, codes, now=None) -> dict:
+        out = {name: 0 for name in TIER_NAMES.values()}
+        for c in codes:
+            out[TIER_NAMES[self.tier(c, now)]] += 1
+        return out
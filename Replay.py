@@ -0,0 +1,290 @@
+"""
+回放：用录制的数据驱动浮窗，与实时行情走相同的 解析 → 快照合并 → 投影（_project_columns）路径
+数据来源：
+  - 新浪原始响应录制文件（.txt / .gz）：每帧以 "#frame <Unix 时间戳>" 一行开头，后接该次轮询的响应体
+  - TickRecorder 记录的某一交易日目录（ticks/YYYYMMDD）：按记录顺序还原为新浪格式的行
+  - 合成会话（--synth N）：SinaSimulator.QuoteBook 以固定种子生成，可作为可重复的端到端基准
+
+    python Replay.py ticks/20261016 --speed 10
+    python Replay.py --synth 300 --rows 200 --speed max --offscreen
+    python Replay.py --synth 300 --rows 200 --save session.txt.gz
+
+速度：1（按录制时的节奏）、10（10 倍速）、max（不等待，尽可能快）
+结束时输出实际达到的每秒更新次数与各阶段耗时
+"""
+import argparse, gzip, hashlib, json, os, re, sys, time
+from collections import namedtuple
+from datetime import datetime
+
+from MarketHours import MARKET_TZ
+from Perf import percentile
+
+# t：录制时刻（秒），codes：该帧请求的代码，payload：响应体字节
+Frame = namedtuple("Frame", ["t", "codes", "payload"])
+
+STAGES = ("parse", "merge", "format", "model", "layout", "paint")
+
+_re_code = re.compile(rb"hq_str_(\w+)=")
+
+
+# ----- 数据来源 -----
+def _open(path, mode):
+    return gzip.open(path, mode) if path.endswith(".gz") else open(path, mode)
+
+
+def load_payloads(path: str) -> list:
+    """读取原始响应录制文件；没有帧标记的文件视为单帧"""
+    with _open(path, "rb") as f:
+        data = f.read()
+    frames = []
+    for i, part in enumerate(re.split(rb"^#frame ", data, flags=re.M)):
+        if not part.strip():
+            continue
+        head, _, body = part.partition(b"\n")
+        try:
+            t = float(head)
+        except ValueError:
+            t, body = float(i), part
+        codes = [c.decode("ascii") for c in _re_code.findall(body)]
+        frames.append(Frame(t, codes, body))
+    return frames
+
+
+def save_payloads(path: str, frames):
+    with _open(path, "wb") as f:
+        for fr in frames:
+            f.write(f"#frame {fr.t:.3f}\n".encode("ascii"))
+            f.write(fr.payload)
+
+
+def synth_frames(n_frames: int, codes, interval=2.0, seed=0, activity=0.3) -> list:
+    from SinaSimulator import QuoteBook
+    book = QuoteBook(seed=seed, activity=activity)
+    return [Frame(i * interval, list(codes), book.payload(codes).encode("gbk")) for i in range(n_frames)]
+
+
+def synth_codes(n: int) -> list:
+    # 与基准一致：约 90% 沪市个股、10% 深市 ETF
+    return [f"sh60{i:04d}" for i in range(n - n // 10)] + [f"sz15{i:04d}" for i in range(n // 10)]
+
+
+def _sina_line(code, name, r) -> str:
+    # r: 一条记录各列的值（字典）；按新浪接口字段顺序还原
+    stamp = datetime.fromtimestamp(r["ts"], MARKET_TZ)
+    if code.startswith("hk"):
+        chg = r["price"] - r["prev_close"]
+        pct = chg / r["prev_close"] * 100 if r["prev_close"] else 0.0
+        fields = [code.upper(), name] + [f"{r[k]:.3f}" for k in ("open", "prev_close", "high", "low", "price")] + [
+            f"{chg:.3f}", f"{pct:.3f}", f"{r['bid1']:.3f}", f"{r['ask1']:.3f}",
+            f"{r['amount']:.0f}", f"{r['volume']:.0f}", "0.000", "0.000", "0.000", "0.000",
+            stamp.strftime("%Y/%m/%d"), stamp.strftime("%H:%M"),
+        ]
+    else:
+        fields = [name] + [f"{r[k]:.3f}" for k in ("open", "prev_close", "price", "high", "low", "bid1", "ask1")] + [
+            f"{r['volume']:.0f}", f"{r['amount']:.3f}",
+        ]
+        for side in ("b", "a"):
+            for i in range(1, 6):
+                fields += [f"{r[f'{side}v{i}']:.0f}", f"{r[f'{side}p{i}']:.3f}"]
+        fields += [stamp.strftime("%Y-%m-%d"), stamp.strftime("%H:%M:%S"), "00"]
+    return f'var hq_str_{code}="' + ",".join(fields) + '";\n'
+
+
+def tick_frames(day_path: str) -> list:
+    """
+    把 TickRecorder 的一日记录还原为帧：记录按轮询顺序追加，
+    同一代码再次出现即视为下一次轮询；帧时刻取已出现的最大交易所时间
+    """
+    from TickRecorder import COLUMNS, TickDay
+    names = [n for n, _ in COLUMNS if n != "sym"]
+    frames = []
+    with TickDay(day_path) as td:
+        cols = {n: td.column(n) for n in names}
+        sym = td.column("sym")
+        # 按首次出现的顺序保留代码（与 PYTHONHASHSEED 无关，回放可复现）
+        seen, lines, t = {}, [], None
+        for i in range(td.rows):
+            code = td.symbols[int(sym[i])]
+            if code in seen:
+                frames.append(Frame(t, list(seen), "".join(lines).encode("gbk")))
+                seen, lines = {}, []
+            r = {n: float(cols[n][i]) for n in names}
+            t = r["ts"] if t is None else max(t, r["ts"])
+            seen[code] = None
+            lines.append(_sina_line(code, code, r))
+        if lines:
+            frames.append(Frame(t, list(seen), "".join(lines).encode("gbk")))
+        del cols, sym
+    return frames
+
+
+# ----- 驱动 -----
+class ReplayStats:
+    def __init__(self):
+        self.samples = {s: [] for s in STAGES}
+        self.frames = 0
+        self.wall = 0.0
+        self.max_lag = 0.0   # 按节奏回放时，落后于录制时刻的最大秒数
+
+    def updates_per_sec(self) -> float:
+        return self.frames / self.wall if self.wall > 0 else 0.0
+
+    def summary(self) -> dict:
+        out = {"frames": self.frames, "wall_s": round(self.wall, 3),
+               "updates_per_s": round(self.updates_per_sec(), 2), "max_lag_s": round(self.max_lag, 3)}
+        for s, v in self.samples.items():
+            v = sorted(v)
+            out[s] = {"mean_ms": round(sum(v) / len(v) * 1e3, 3) if v else 0.0,
+                      "p50_ms": round(percentile(v, 50) * 1e3, 3), "p95_ms": round(percentile(v, 95) * 1e3, 3),
+                      "max_ms": round(v[-1] * 1e3, 3) if v else 0.0}
+        return out
+
+    def report(self) -> str:
+        s = self.summary()
+        lines = [f"帧数 {s['frames']}，用时 {s['wall_s']} 秒，{s['updates_per_s']} 次更新/秒，最大落后 {s['max_lag_s']} 秒",
+                 f"{'stage':8}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}  (ms)"]
+        for st in STAGES:
+            d = s[st]
+            lines.append(f"{st:8}{d['mean_ms']:10.3f}{d['p50_ms']:10.3f}{d['p95_ms']:10.3f}{d['max_ms']:10.3f}")
+        return "\n".join(lines)
+
+
+class ReplayDriver:
+    """
+    把帧依次喂给 FloatLabel：
+    parse  = 流式解析（与后台拉取线程相同的 StreamParser + LineCache）
+    merge  = _on_quotes_ready 中除投影外的部分（快照合并、分时追加等）
+    format = _project_columns 中的格式化与委托同步
+    model  = SimpleTableModel.set_rows_headers
+    layout = _update_layout（列宽测量与窗口尺寸）
+    paint  = 随后处理事件（视图布局与重绘）
+    """
+    def __init__(self, win, app, frames, speed=None):
+        self.win = win
+        self.app = app
+        self.frames = frames
+        self.speed = speed          # None 为尽可能快
+        self.stats = ReplayStats()
+        self._acc = {"project": 0.0, "model": 0.0, "layout": 0.0}
+        win.detach_feed()
+        self._wrap(win, "_project_columns", "project")
+        self._wrap(win.model, "set_rows_headers", "model")
+        self._wrap(win, "_update_layout", "layout")
+
+    def _wrap(self, obj, name, stage):
+        fn = getattr(obj, name)
+        acc = self._acc
+
+        def timed(*a, **k):
+            t = time.perf_counter()
+            try:
+                return fn(*a, **k)
+            finally:
+                acc[stage] += time.perf_counter() - t
+        setattr(obj, name, timed)
+
+    def _wait_until(self, target):
+        while True:
+            d = target - time.perf_counter()
+            if d <= 0:
+                return
+            self.app.processEvents()
+            time.sleep(min(d, 0.005))
+
+    def run(self) -> ReplayStats:
+        win, app, st, acc = self.win, self.app, self.stats, self._acc
+        app.processEvents()
+        start = time.perf_counter()
+        t0 = self.frames[0].t if self.frames else 0.0
+        for fr in self.frames:
+            if self.speed:
+                target = start + (fr.t - t0) / self.speed
+                self._wait_until(target)
+                st.max_lag = max(st.max_lag, time.perf_counter() - target)
+            for k in acc:
+                acc[k] = 0.0
+
+            t = time.perf_counter()
+            parser = win._new_parser()
+            parser.feed(fr.payload)
+            quotes = parser.close()
+            digest = hashlib.blake2b(parser.digest(), digest_size=16).digest()
+            t1 = time.perf_counter()
+            win._on_quotes_ready(fr.codes, (quotes, digest))
+            t2 = time.perf_counter()
+            app.processEvents()
+            t3 = time.perf_counter()
+
+            project = acc["project"]
+            samples = st.samples
+            samples["parse"].append(t1 - t)
+            samples["merge"].append(t2 - t1 - project)
+            samples["format"].append(max(0.0, project - acc["model"] - acc["layout"]))
+            samples["model"].append(acc["model"])
+            samples["layout"].append(acc["layout"])
+            samples["paint"].append(t3 - t2)
+            st.frames += 1
+        st.wall = time.perf_counter() - start
+        return st
+
+
+def _replay_config(path, codes) -> dict:
+    cfg = {}
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+    else:
+        cfg.update({"name_visible": True, "price_visible": True, "change_pct_visible": True,
+                    "vol_visible": True, "kline_visible": True, "spark_visible": True})
+    cfg.update({"codes": codes, "checked_codes": codes, "market_hours_only": False, "record_ticks": False})
+    return cfg
+
+
+def main():
+    ap = argparse.ArgumentParser(description="回放录制的行情，驱动浮窗并统计各阶段耗时")
+    ap.add_argument("source", nargs="?", help="原始响应录制文件，或 TickRecorder 的交易日目录")
+    ap.add_argument("--synth", type=int, default=0, help="不读文件，生成 N 帧合成行情")
+    ap.add_argument("--rows", type=int, default=200, help="合成行情的股票数")
+    ap.add_argument("--interval", type=float, default=2.0, help="合成行情的帧间隔（秒）")
+    ap.add_argument("--activity", type=float, default=0.3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--save", help="把帧保存为原始响应录制文件后退出")
+    ap.add_argument("--speed", default="1", help="1、10 等倍速，或 max")
+    ap.add_argument("--config", help="浮窗配置（SW_config.json），缺省使用内置列设置")
+    ap.add_argument("--offscreen", action="store_true", help="不显示窗口（QT_QPA_PLATFORM=offscreen）")
+    ap.add_argument("--json", action="store_true", help="以 JSON 输出统计")
+    args = ap.parse_args()
+
+    if args.synth:
+        frames = synth_frames(args.synth, synth_codes(args.rows), args.interval, args.seed, args.activity)
+    elif args.source and os.path.isdir(args.source):
+        frames = tick_frames(args.source)
+    elif args.source:
+        frames = load_payloads(args.source)
+    else:
+        ap.error("需要 source 或 --synth")
+    if args.save:
+        save_payloads(args.save, frames)
+        print(f"已保存 {len(frames)} 帧到 {args.save}")
+        return
+    if not frames:
+        print("没有可回放的帧")
+        return
+
+    if args.offscreen:
+        os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    from PySide6.QtWidgets import QApplication
+    from WidgetPanel import FloatLabel
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    codes = list(dict.fromkeys(c for fr in frames for c in fr.codes))
+    win = FloatLabel(_replay_config(args.config, codes), live=False)
+    win.show()
+    speed = None if args.speed == "max" else float(args.speed)
+    stats = ReplayDriver(win, app, frames, speed).run()
+    win.shutdown()
+    print(json.dumps(stats.summary(), ensure_ascii=False) if args.json else stats.report())
+
+
+if __name__ == "__main__":
+    main()
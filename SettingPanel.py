@@ -26,7 +26,7 @@ class SettingsDialog(QDialog):
 
         self.tab_sizes = {
             0: QSize(300, 300),
-            1: QSize(440, 420),
+            1: QSize(440, 550),
             2: QSize(360, 350),
             3: QSize(300, 220),
         }
@@ -85,9 +85,29 @@ class SettingsDialog(QDialog):
             self.cmb_interval.addItem(f"{s} 秒", userData=s)
         idx = self.cmb_interval.findData(self.win.refresh_seconds)
         self.cmb_interval.setCurrentIndex(idx if idx >= 0 else 1)
+        self.chk_market_hours = QCheckBox("仅交易时段刷新")
+        self.chk_market_hours.setChecked(bool(getattr(self.win, 'market_hours_only', True)))
         v = QVBoxLayout(g_interval)
         v.setContentsMargins(6,6,6,6)
         v.addWidget(self.cmb_interval)
+        self.chk_adaptive = QCheckBox("按活跃度分档刷新")
+        self.chk_adaptive.setChecked(bool(getattr(self.win, 'adaptive_refresh', False)))
+        v.addWidget(self.chk_market_hours)
+        v.addWidget(self.chk_adaptive)
+        self.chk_record = QCheckBox("记录分笔数据")
+        self.chk_record.setChecked(bool(getattr(self.win, 'record_ticks', False)))
+        v.addWidget(self.chk_record)
+        self.cmb_page = QComboBox()
+        self.cmb_page.setFixedWidth(136)
+        self.cmb_page.addItem("不分页", userData=0)
+        for n in [10,15,20,30,50]:
+            self.cmb_page.addItem(f"每页 {n} 行", userData=n)
+        idx = self.cmb_page.findData(int(getattr(self.win, 'page_size', 0)))
+        if idx < 0:
+            self.cmb_page.addItem(f"每页 {self.win.page_size} 行", userData=self.win.page_size)
+            idx = self.cmb_page.count() - 1
+        self.cmb_page.setCurrentIndex(idx)
+        v.addWidget(self.cmb_page)
         data_settings.addWidget(g_interval)
 
         # 3.显示选项
@@ -183,7 +203,7 @@ class SettingsDialog(QDialog):
         gl_flag_other = QGridLayout(g_flag_other)
         gl_flag_other.setHorizontalSpacing(6)
         gl_flag_other.setVerticalSpacing(6)
-        for i in range(11,12):
+        for i in range(11,13):
             cb = QCheckBox(cb_texts[i])
             cb.setChecked(self.win.header_is_visible(cb_texts[i]))
             cb.stateChanged.connect(partial(self._on_cb_changed, cb_texts[i]))
@@ -345,6 +365,10 @@ class SettingsDialog(QDialog):
         self.btn_dn.clicked.connect(self._move_down)
         # 连接：其它设置
         self.cmb_interval.currentIndexChanged.connect(self._on_interval_changed)
+        self.chk_market_hours.toggled.connect(self._on_market_hours_toggled)
+        self.chk_adaptive.toggled.connect(self._on_adaptive_toggled)
+        self.chk_record.toggled.connect(self._on_record_toggled)
+        self.cmb_page.currentIndexChanged.connect(self._on_page_size_changed)
         self.cmb_namelength.currentIndexChanged.connect(self._on_name_length_changed)
         self.chk_default_color.toggled.connect(self._on_default_color_toggled)
         self.btn_fg.clicked.connect(self.pick_fg)
@@ -494,6 +518,20 @@ class SettingsDialog(QDialog):
         if isinstance(seconds,int): 
             self.win.set_refresh_interval(seconds)
 
+    def _on_market_hours_toggled(self, checked: bool):
+        self.win.set_market_hours_only(bool(checked))
+
+    def _on_adaptive_toggled(self, checked: bool):
+        self.win.set_adaptive_refresh(bool(checked))
+
+    def _on_record_toggled(self, checked: bool):
+        self.win.set_record_ticks(bool(checked))
+
+    def _on_page_size_changed(self, idx):
+        n = self.cmb_page.currentData()
+        if isinstance(n, int):
+            self.win.set_page_size(n)
+
     def _on_default_color_toggled(self, checked: bool):
         self.btn_fg.setEnabled(not checked)
         self.win.set_default_color(bool(checked))
@@ -571,7 +609,7 @@ class SettingsDialog(QDialog):
             if hasattr(self, 'app') and self.app is not None:
                 try:
                     self.app.set_app_icon(val)
-                    # persist immediately
+                    # persist (debounced)
                     try:
                         self.app.save_now()
                     except Exception:
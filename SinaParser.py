@@ -0,0 +1,183 @@
+import hashlib, time
+
+from Quote import Quote
+
+# ----- 新浪行情解析（字节级） -----
+# var hq_str_sh600000="浦发银行,10.01,10.00,...,2026-10-16,15:00:03,00";
+# 直接处理原始响应字节：每行只切分一次字段，仅对名称字段做 GBK 解码
+
+_EMPTY5_I = (0, 0, 0, 0, 0)
+_EMPTY5_F = (0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+def _f(b):
+    return float(b) if b else 0.0
+
+
+def _i(b):
+    # 挂单量偶尔带小数
+    try:
+        return int(b) if b else 0
+    except ValueError:
+        return int(float(b))
+
+
+def parse_line(line: bytes):
+    """解析单行为 Quote；空行情、截断（缺少结尾引号）或字段不足的行返回 None"""
+    k = line.find(b"hq_str_")
+    if k < 0:
+        return None
+    q = line.find(b'="', k)
+    if q < 0:
+        return None
+    end = line.find(b'"', q + 2)
+    if end <= q + 2:
+        return None
+    code = line[k + 7:q].decode("ascii", "replace")
+    p = line[q + 2:end].split(b",")
+    n = len(p)
+    try:
+        if code.startswith("hk"):
+            # 港股：英文名,中文名,今开,昨收,最高,最低,现价,涨跌,涨跌幅,买一价,卖一价,成交额,成交量,...,日期,时间
+            if n < 13:
+                return None
+            return Quote(
+                code, p[1].decode("gbk", "replace"), True,
+                _f(p[2]), _f(p[3]), _f(p[6]), _f(p[4]), _f(p[5]),
+                _f(p[9]), _f(p[10]), _f(p[12]), _f(p[11]),
+                _EMPTY5_I, _EMPTY5_F, _EMPTY5_I, _EMPTY5_F,
+                p[17].decode("ascii", "replace") if n > 17 else "",
+                p[18].decode("ascii", "replace") if n > 18 else "",
+            )
+        # 沪深京：名称,今开,昨收,现价,最高,最低,买一,卖一,成交量,成交额,买1~5(量,价),卖1~5(量,价),日期,时间
+        if n < 32:
+            return None
+        try:
+            # 快速路径：字段均非空时直接转换
+            return Quote(
+                code, p[0].decode("gbk", "replace"), False,
+                float(p[1]), float(p[2]), float(p[3]), float(p[4]), float(p[5]),
+                float(p[6]), float(p[7]), float(p[8]), float(p[9]),
+                (int(p[10]), int(p[12]), int(p[14]), int(p[16]), int(p[18])),
+                (float(p[11]), float(p[13]), float(p[15]), float(p[17]), float(p[19])),
+                (int(p[20]), int(p[22]), int(p[24]), int(p[26]), int(p[28])),
+                (float(p[21]), float(p[23]), float(p[25]), float(p[27]), float(p[29])),
+                p[30].decode("ascii", "replace"),
+                p[31].decode("ascii", "replace"),
+            )
+        except ValueError:
+            pass
+        # 空字段（停牌、开盘前）或挂单量带小数
+        return Quote(
+            code, p[0].decode("gbk", "replace"), False,
+            _f(p[1]), _f(p[2]), _f(p[3]), _f(p[4]), _f(p[5]),
+            _f(p[6]), _f(p[7]), _f(p[8]), _f(p[9]),
+            (_i(p[10]), _i(p[12]), _i(p[14]), _i(p[16]), _i(p[18])),
+            (_f(p[11]), _f(p[13]), _f(p[15]), _f(p[17]), _f(p[19])),
+            (_i(p[20]), _i(p[22]), _i(p[24]), _i(p[26]), _i(p[28])),
+            (_f(p[21]), _f(p[23]), _f(p[25]), _f(p[27]), _f(p[29])),
+            p[30].decode("ascii", "replace"),
+            p[31].decode("ascii", "replace"),
+        )
+    except ValueError:
+        return None
+
+
+def parse_payload(data: bytes) -> list:
+    """解析完整响应体"""
+    out = []
+    for line in data.split(b"\n"):
+        rec = parse_line(line)
+        if rec is not None:
+            out.append(rec)
+    return out
+
+
+class LineCache:
+    """
+    按代码缓存上一次的原始行及其解析结果：两次轮询之间字节完全相同的行直接复用记录
+    """
+    def __init__(self):
+        self._lines = {}   # code(bytes) -> (line, record)
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, line: bytes):
+        k = line.find(b"hq_str_")
+        q = line.find(b'="', k) if k >= 0 else -1
+        if q < 0:
+            return None
+        code = line[k + 7:q]
+        entry = self._lines.get(code)
+        if entry is not None and entry[0] == line:
+            self.hits += 1
+            return entry[1]
+        rec = parse_line(line)
+        self._lines[code] = (line, rec)
+        self.misses += 1
+        return rec
+
+    def raw_lines(self, codes) -> list:
+        """codes 中已缓存的原始行（按 codes 顺序），用于保存离线快照"""
+        lines = self._lines
+        out = []
+        for c in codes:
+            entry = lines.get(str(c).encode("ascii", "replace"))
+            if entry is not None and entry[1] is not None:
+                out.append(entry[0])
+        return out
+
+    def retain(self, codes):
+        keep = {str(c).encode("ascii", "replace") for c in codes}
+        # list() 一次性取快照，避免与后台线程的写入并发迭代
+        self._lines = {c: v for c, v in list(self._lines.items()) if c in keep}
+
+
+class StreamParser:
+    """
+    流式解析：响应按块到达时调用 feed()，完整的行立即解析，不完整的尾部留到下一块
+    同时计算整个响应体的摘要，用于判断两次轮询结果是否完全相同
+    """
+    def __init__(self, cache: LineCache = None):
+        self._parse = cache.parse if cache is not None else parse_line
+        self.reset()
+
+    def reset(self):
+        self._buf = b""
+        self._hash = hashlib.blake2b(digest_size=16)
+        self.records = []
+        self.cpu = 0.0   # feed/close 累计耗时（秒），用于从传输时间中扣除解析时间
+
+    def digest(self) -> bytes:
+        return self._hash.digest()
+
+    def feed(self, chunk: bytes):
+        if not chunk:
+            return
+        t = time.perf_counter()
+        self._feed(chunk)
+        self.cpu += time.perf_counter() - t
+
+    def _feed(self, chunk: bytes):
+        self._hash.update(chunk)
+        buf = self._buf + chunk if self._buf else chunk
+        nl = buf.rfind(b"\n")
+        if nl < 0:
+            self._buf = buf
+            return
+        self._buf = buf[nl + 1:]
+        parse = self._parse
+        for line in buf[:nl].split(b"\n"):
+            rec = parse(line)
+            if rec is not None:
+                self.records.append(rec)
+
+    def close(self) -> list:
+        if self._buf:
+            t = time.perf_counter()
+            rec = self._parse(self._buf)
+            if rec is not None:
+                self.records.append(rec)
+            self._buf = b""
+            self.cpu += time.perf_counter() - t
+        return self.records
@@ -0,0 +1,231 @@
+"""
+本地模拟新浪行情服务（hq.sinajs.cn），用于压测、延迟与故障测试
+
+    python SinaSimulator.py --port 8765 --latency 0.05 --jitter 0.02 --error-rate 0.01 --truncate-rate 0.01
+
+然后在 SW_config.json 中设置 "quote_base_url": "http://127.0.0.1:8765"
+"""
+import argparse, gzip, random, re, threading, time
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from MarketHours import MARKET_TZ
+
+_re_a = re.compile(r'^(sh|sz|bj)\d{6}$')
+_re_hk = re.compile(r'^hk\d{5}$')
+
+
+class _Quote:
+    """单只股票的随机游走行情"""
+    __slots__ = ("code", "name", "hk", "dec", "prev", "open", "price", "high", "low", "vol", "amt", "rng",
+                 "bids", "asks", "stamp")
+
+    def __init__(self, code: str, seed: int):
+        self.code = code
+        self.hk = code.startswith("hk")
+        self.rng = random.Random(f"{seed}:{code}")
+        # ETF（沪 5 开头、深 1 开头）报价 3 位小数
+        self.dec = 3 if (not self.hk and code[2] in ("1", "5")) else 2
+        self.name = f"模拟{code[-4:]}"
+        base = 1.0 if self.dec == 3 else 5.0
+        self.prev = round(base + self.rng.random() * (400.0 if self.hk else 60.0), self.dec)
+        self.open = round(self.prev * (1 + self.rng.uniform(-0.02, 0.02)), self.dec)
+        self.price = self.open
+        self.high = self.open
+        self.low = self.open
+        self.vol = 0
+        self.amt = 0.0
+        self.stamp = datetime.now(MARKET_TZ)
+        self._make_book()
+
+    def _make_book(self):
+        tick = 10 ** -self.dec
+        self.bids = [(self.rng.randint(1, 2000) * 100, self.price - tick * (i + 1)) for i in range(5)]
+        self.asks = [(self.rng.randint(1, 2000) * 100, self.price + tick * i) for i in range(5)]
+
+    def step(self, now: datetime):
+        tick = 10 ** -self.dec
+        lim_hi = round(self.prev * 1.1, self.dec)
+        lim_lo = round(self.prev * 0.9, self.dec)
+        move = self.rng.choice((-2, -1, -1, 0, 1, 1, 2)) * tick
+        self.price = round(min(lim_hi, max(lim_lo, self.price + move)), self.dec)
+        self.high = max(self.high, self.price)
+        self.low = min(self.low, self.price)
+        lots = self.rng.randint(1, 500) * 100
+        self.vol += lots
+        self.amt += lots * self.price
+        self.stamp = now
+        self._make_book()
+
+    def line(self) -> str:
+        # 未推进的股票返回与上次字节完全相同的行（时间戳为最后一次变化的时间）
+        now = self.stamp
+        if self.hk:
+            chg = self.price - self.prev
+            fields = [
+                self.code.upper(), self.name,
+                f"{self.open:.3f}", f"{self.prev:.3f}", f"{self.high:.3f}", f"{self.low:.3f}", f"{self.price:.3f}",
+                f"{chg:.3f}", f"{chg / self.prev * 100:.3f}",
+                f"{self.price - 0.2:.3f}", f"{self.price:.3f}",
+                f"{self.amt:.0f}", f"{self.vol}", "0.000", "0.000", f"{self.prev * 1.5:.3f}", f"{self.prev * 0.5:.3f}",
+                now.strftime("%Y/%m/%d"), now.strftime("%H:%M"),
+            ]
+        else:
+            fmt = f"{{:.{self.dec}f}}"
+            bids, asks = self.bids, self.asks
+            fields = [
+                self.name, fmt.format(self.open), fmt.format(self.prev), fmt.format(self.price),
+                fmt.format(self.high), fmt.format(self.low), fmt.format(bids[0][1]), fmt.format(asks[0][1]),
+                f"{self.vol}", f"{self.amt:.3f}",
+            ]
+            for v, p in bids + asks:
+                fields += [f"{v}", fmt.format(p)]
+            fields += [now.strftime("%Y-%m-%d"), now.strftime("%H:%M:%S"), "00"]
+        return f'var hq_str_{self.code}="' + ",".join(fields) + '";\n'
+
+
+class QuoteBook:
+    """
+    按需生成的合成行情；每次请求以 activity 概率推进每只股票的价格
+    未知格式的代码返回空行情，与真实接口一致
+    """
+    def __init__(self, seed=0, activity=0.5):
+        self.seed = seed
+        self.activity = float(activity)
+        self._quotes = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    def payload(self, codes) -> str:
+        now = datetime.now(MARKET_TZ)
+        out = []
+        with self._lock:
+            for code in codes:
+                code = code.strip().lower()
+                if not (_re_a.match(code) or _re_hk.match(code)):
+                    out.append(f'var hq_str_{code}="";\n')
+                    continue
+                q = self._quotes.get(code)
+                if q is None:
+                    q = self._quotes[code] = _Quote(code, self.seed)
+                if self._rng.random() < self.activity:
+                    q.step(now)
+                out.append(q.line())
+        return "".join(out)
+
+
+class SimHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "SinaSimulator/1.0"
+    # 响应头与响应体分两次发送：关闭 Nagle，避免与客户端延迟确认叠加出约 40 ms 的等待
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        opts = self.server.options
+        rng = self.server.rng
+        self.server.count_request()
+        if opts["max_url"] and len(self.path) > opts["max_url"]:
+            self._send(414, b"")
+            return
+        if not self.path.startswith("/list="):
+            self._send(404, b"")
+            return
+        codes = [c for c in self.path[len("/list="):].split(",") if c]
+        delay = opts["latency"] + opts["per_symbol"] * len(codes)
+        if opts["jitter"]:
+            delay += rng.uniform(0, opts["jitter"])
+        if delay > 0:
+            time.sleep(delay)
+        if opts["error_rate"] and rng.random() < opts["error_rate"]:
+            self._send(rng.choice((500, 502, 503)), b"")
+            return
+        body = self.server.book.payload(codes).encode("gbk")
+        if opts["truncate_rate"] and body and rng.random() < opts["truncate_rate"]:
+            # 模拟截断：在随机位置截断响应（某一行不完整）
+            body = body[:rng.randint(1, len(body) - 1)] if len(body) > 1 else b""
+        self._send(200, body)
+
+    def _send(self, status, body):
+        gz = "gzip" in (self.headers.get("Accept-Encoding") or "") and len(body) > 256
+        if gz:
+            body = gzip.compress(body, compresslevel=1)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/javascript; charset=GBK")
+        if gz:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class SinaSimulator(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, seed=0, activity=0.5, latency=0.0, jitter=0.0,
+                 per_symbol=0.0, error_rate=0.0, truncate_rate=0.0, max_url=0):
+        super().__init__((host, port), SimHandler)
+        self.book = QuoteBook(seed=seed, activity=activity)
+        self.rng = random.Random(seed + 1)
+        self.options = {
+            "latency": float(latency),
+            "jitter": float(jitter),
+            "per_symbol": float(per_symbol),
+            "error_rate": float(error_rate),
+            "truncate_rate": float(truncate_rate),
+            "max_url": int(max_url),
+        }
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self):
+        """在后台线程中运行，返回 base_url"""
+        self._thread = threading.Thread(target=self.serve_forever, name="SinaSimulator", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="本地模拟新浪行情服务")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--activity", type=float, default=0.5, help="每次请求中单只股票价格变动的概率")
+    ap.add_argument("--latency", type=float, default=0.0, help="每次请求的固定延迟（秒）")
+    ap.add_argument("--jitter", type=float, default=0.0, help="额外随机延迟上限（秒）")
+    ap.add_argument("--per-symbol", type=float, default=0.0, help="每个代码的处理耗时（秒）")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="返回 5xx 的概率")
+    ap.add_argument("--truncate-rate", type=float, default=0.0, help="截断响应体的概率")
+    ap.add_argument("--max-url", type=int, default=0, help="URL 长度上限，超出返回 414（0 不限制）")
+    args = ap.parse_args()
+
+    sim = SinaSimulator(args.host, args.port, seed=args.seed, activity=args.activity, latency=args.latency,
+                        jitter=args.jitter, per_symbol=args.per_symbol, error_rate=args.error_rate,
+                        truncate_rate=args.truncate_rate, max_url=args.max_url)
+    print(f"SinaSimulator listening on {sim.base_url}")
+    try:
+        sim.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.server_close()
+
+
+if __name__ == "__main__":
+    main()
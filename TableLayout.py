@@ -0,0 +1,125 @@
+import math
+
+from PySide6.QtGui import QFontMetricsF
+from PySide6.QtWidgets import QTableView
+
+
+class TableLayout:
+    """
+    浮窗表格的列宽缓存
+    - 列集合/字体/表头可见性变化时全量测量一次（resizeColumnsToContents），并标定每列的边距与表头宽度
+    - 之后每次刷新只测量内容变化的单元格（文本宽度按字符串缓存），增量维护每列最大文本宽度
+    - 列宽 = max(最大文本宽度 + 边距, 表头宽度, 最小列宽)，与 Qt 的 resizeColumnToContents 规则一致
+    """
+    MEASURE_CACHE_MAX = 4096
+
+    def __init__(self, table: QTableView):
+        self.table = table
+        self._state = None
+        self._fm = None
+        self._font_key = None
+        self._measure = {}  # text -> 像素宽度
+        self._cells = {}    # 行键(代码) -> (row, [每列文本宽度])
+        self._col_max = []  # 每列最大文本宽度
+        self._pad = []      # 每列：单元格 sizeHint 宽度 - 文本宽度
+        self._head = []     # 每列表头宽度（表头隐藏时为 0）
+        self.full_count = 0
+        self.measured = 0
+
+    def invalidate(self):
+        """字体、样式、委托等变化后调用：下次 update 全量测量"""
+        self._state = None
+
+    def _text_w(self, cell) -> int:
+        if not isinstance(cell, str) or not cell:
+            return 0
+        w = self._measure.get(cell)
+        if w is None:
+            if len(self._measure) > self.MEASURE_CACHE_MAX:
+                self._measure.clear()
+            # 与委托的 sizeHint 一致：浮点宽度向上取整
+            w = self._measure[cell] = math.ceil(self._fm.horizontalAdvance(cell))
+            self.measured += 1
+        return w
+
+    def _state_key(self, headers):
+        return (tuple(headers), self.table.font().key(), self.table.horizontalHeader().isHidden())
+
+    def update(self, rows, keys, headers) -> bool:
+        """rows 与 keys（每行唯一键）一一对应；返回列宽是否变化"""
+        ncol = len(headers)
+        if self._state != self._state_key(headers) or len(self._pad) != ncol:
+            return self.full(rows, keys, headers)
+
+        cells, col_max = self._cells, self._col_max
+        dirty = set()
+        live = set(keys)
+        for k in [k for k in cells if k not in live]:
+            _, ws = cells.pop(k)
+            for c in range(ncol):
+                if ws[c] == col_max[c]:
+                    dirty.add(c)
+
+        for row, k in zip(rows, keys):
+            entry = cells.get(k)
+            if entry is not None and entry[0] is row:
+                continue
+            if entry is None:
+                ws = [self._text_w(row[c]) for c in range(ncol)]
+                for c in range(ncol):
+                    if ws[c] > col_max[c]:
+                        col_max[c] = ws[c]
+            else:
+                old_row, ws = entry[0], list(entry[1])
+                for c in range(ncol):
+                    if row[c] == old_row[c]:
+                        continue
+                    old, w = ws[c], self._text_w(row[c])
+                    ws[c] = w
+                    if w > col_max[c]:
+                        col_max[c] = w
+                    elif w < old == col_max[c]:
+                        dirty.add(c)
+            cells[k] = (row, ws)
+
+        # 原最大值所在的单元格变窄或被删除：该列重新求最大值（不需要重新测量）
+        for c in dirty:
+            col_max[c] = max((ws[c] for _, ws in cells.values()), default=0)
+        return self._apply()
+
+    def full(self, rows, keys, headers) -> bool:
+        table = self.table
+        font_key = table.font().key()
+        if font_key != self._font_key:
+            self._font_key = font_key
+            self._fm = QFontMetricsF(table.font())
+            self._measure.clear()
+        table.resizeColumnsToContents()
+        self.full_count += 1
+
+        ncol = len(headers)
+        self._cells = {k: (row, [self._text_w(row[c]) for c in range(ncol)]) for row, k in zip(rows, keys)}
+        self._col_max = [max((ws[c] for _, ws in self._cells.values()), default=0) for c in range(ncol)]
+        hh = table.horizontalHeader()
+        # 表头宽度；列宽同时受表头最小宽度限制
+        min_w = hh.minimumSectionSize()
+        self._head = [max(min_w, 0 if hh.isHidden() else hh.sectionSizeHint(c)) for c in range(ncol)]
+        if rows:
+            self._pad = [max(0, table.sizeHintForColumn(c) - self._col_max[c]) for c in range(ncol)]
+            self._state = self._state_key(headers)
+            self._apply()
+        else:
+            # 无数据时无法标定边距，下次有数据时再全量测量
+            self._pad = []
+            self._state = None
+        return True
+
+    def _apply(self) -> bool:
+        table = self.table
+        changed = False
+        for c, (m, pad, head) in enumerate(zip(self._col_max, self._pad, self._head)):
+            w = max(m + pad, head)
+            if table.columnWidth(c) != w:
+                table.setColumnWidth(c, w)
+                changed = True
+        return changed
@@ -0,0 +1,110 @@
+from array import array
+from collections import namedtuple
+
+# 分时数据：每只股票一个定长环形缓冲区（array 存储，内存固定），由每次轮询的行情追加
+
+# 表格单元格载荷：ring 在主线程追加，version 变化即表示需要重绘
+Spark = namedtuple("Spark", ["code", "version", "ring", "prev_close"])
+
+
+class TickRing:
+    """定长环形缓冲区：(时间戳, 价格, 成交量)，写满后覆盖最旧的数据"""
+    __slots__ = ("capacity", "ts", "price", "volume", "start", "count", "version", "day")
+
+    def __init__(self, capacity: int):
+        self.capacity = max(2, int(capacity))
+        self.ts = array("d", bytes(8 * self.capacity))
+        self.price = array("d", bytes(8 * self.capacity))   # float32 无法精确保存 1234.56 等价格，未变化判断会失效
+        self.volume = array("d", bytes(8 * self.capacity))
+        self.start = 0
+        self.count = 0
+        self.version = 0
+        self.day = ""
+
+    def clear(self):
+        self.start = 0
+        self.count = 0
+        self.version += 1
+
+    def append(self, ts: float, price: float, volume: float):
+        i = (self.start + self.count) % self.capacity
+        self.ts[i] = ts
+        self.price[i] = price
+        self.volume[i] = volume
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+        self.version += 1
+
+    def _ordered(self, arr):
+        end = self.start + self.count
+        if end <= self.capacity:
+            return arr[self.start:end]
+        return arr[self.start:] + arr[:end - self.capacity]
+
+    def prices(self):
+        """按时间顺序返回价格（array）"""
+        return self._ordered(self.price)
+
+    def timestamps(self):
+        return self._ordered(self.ts)
+
+    def volumes(self):
+        return self._ordered(self.volume)
+
+    def last(self):
+        if not self.count:
+            return None
+        i = (self.start + self.count - 1) % self.capacity
+        return self.ts[i], self.price[i], self.volume[i]
+
+    def __len__(self):
+        return self.count
+
+
+class TickHistory:
+    """
+    全部自选股的分时缓冲区
+    - 同一行情记录（行缓存命中，对象未变）不重复追加
+    - 交易日变化时清空该股票的缓冲区
+    """
+    def __init__(self, capacity=2400):
+        self.capacity = max(2, int(capacity))
+        self._rings = {}   # code -> TickRing
+        self._last = {}    # code -> 最近追加的 Quote
+
+    def observe(self, q, ts: float) -> bool:
+        """记录一次行情；返回是否追加了新点"""
+        if self._last.get(q.code) is q:
+            return False
+        self._last[q.code] = q
+        ring = self._rings.get(q.code)
+        if ring is None:
+            ring = self._rings[q.code] = TickRing(self.capacity)
+        if q.date and q.date != ring.day:
+            ring.day = q.date
+            ring.clear()
+        if q.last <= 0:
+            return False
+        prev = ring.last()
+        if prev is not None and prev[2] == q.volume and abs(prev[1] - q.last) < 1e-6:
+            return False   # 价格与成交量均未变化
+        ring.append(ts, q.last, q.volume)
+        return True
+
+    def ring(self, code):
+        return self._rings.get(code)
+
+    def spark(self, q) -> Spark:
+        ring = self._rings.get(q.code)
+        return Spark(q.code, ring.version if ring is not None else -1, ring, q.prev_close)
+
+    def forget(self, keep):
+        keep = set(keep)
+        self._rings = {c: r for c, r in self._rings.items() if c in keep}
+        self._last = {c: q for c, q in self._last.items() if c in keep}
+
+    def memory_bytes(self) -> int:
+        # 每个点：时间戳、价格、成交量各 8 字节
+        return len(self._rings) * self.capacity * 24
@@ -0,0 +1,296 @@
+"""
+分笔记录：把每次轮询解析出的行情追加写入按交易日划分的列式二进制文件，读取时 mmap 按需访问
+
+目录结构（本机字节序）：
+    <root>/<YYYYMMDD>/symbols.txt    代码表，每行一个，行号即 sym 编号
+    <root>/<YYYYMMDD>/<列名>.bin     每列一个定长数组文件，各列第 i 个元素属于同一条记录
+
+    python TickRecorder.py [--root DIR] [DAY [CODE]]
+"""
+import argparse, mmap, os, threading, time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from MarketHours import MARKET_TZ, market_now
+
+_np = None
+
+
+def _numpy():
+    # 读取时可选加速；numpy 导入较慢，首次读取时才导入，未安装时返回 None
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+# (列名, array 类型码)；ts 为交易所时间（新浪字段 30/31，港股为 17/18）对应的 Unix 时间戳
+COLUMNS = (
+    ("sym", "I"), ("ts", "d"),
+    ("open", "d"), ("prev_close", "d"), ("price", "d"), ("high", "d"), ("low", "d"),
+    ("bid1", "d"), ("ask1", "d"), ("volume", "d"), ("amount", "d"),
+) + tuple((f"bv{i}", "d") for i in range(1, 6)) + tuple((f"bp{i}", "d") for i in range(1, 6)) \
+  + tuple((f"av{i}", "d") for i in range(1, 6)) + tuple((f"ap{i}", "d") for i in range(1, 6))
+
+_NP_TYPES = {"I": "uint32", "d": "float64"}
+
+
+def default_record_dir() -> str:
+    return os.path.join(os.getenv("APPDATA") or os.path.expanduser("~"), "StockWidget", "ticks")
+
+
+def list_days(root: str) -> list:
+    try:
+        return sorted(d for d in os.listdir(root) if len(d) == 8 and d.isdigit())
+    except OSError:
+        return []
+
+
+class TickRecorder:
+    """
+    追加写入器
+    - 主线程 record() 只把数值追加到内存中的列缓冲
+    - 累积 flush_rows 条或超过 flush_interval 秒后，由单个后台线程按列追加到文件
+    - 同一行情记录（对象未变）或时间、价格、成交量均未变化的记录不重复写入
+    """
+    def __init__(self, root: str = None, flush_rows=2048, flush_interval=5.0):
+        self.root = root or default_record_dir()
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = float(flush_interval)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="TickRecorder")
+        self._lock = threading.Lock()
+        # 交易日 -> [代码表 {code: sid}, 未写盘的新代码, 列缓冲, 缓冲条数]
+        # 港股与沪深日期不同或个别行日期滞后时，两个交易日的记录会交替出现，各自缓冲、各自编号
+        self._days = {}
+        self._rows = 0
+        self._last = {}        # code -> Quote
+        self._last_key = {}    # code -> (ts, volume, price)
+        self._day_epoch = {}   # 日期字符串 -> 当日 0 点时间戳
+        self._last_flush = time.monotonic()
+        self.rows_written = 0
+        self.bytes_written = 0
+
+    @staticmethod
+    def _new_buffers():
+        return {name: array(code) for name, code in COLUMNS}
+
+    def _exchange_ts(self, date: str, hms: str) -> float:
+        day0 = self._day_epoch.get(date)
+        if day0 is None:
+            y, m, d = (int(x) for x in date.replace("/", "-").split("-"))
+            day0 = self._day_epoch[date] = datetime(y, m, d, tzinfo=MARKET_TZ).timestamp()
+        parts = hms.split(":")
+        secs = int(parts[0]) * 3600 + int(parts[1]) * 60 + (int(parts[2]) if len(parts) > 2 else 0)
+        return day0 + secs
+
+    def record(self, quotes) -> int:
+        """追加一批 Quote，返回写入缓冲的条数"""
+        n = 0
+        for q in quotes:
+            if self._last.get(q.code) is q:
+                continue
+            self._last[q.code] = q
+            try:
+                ts = self._exchange_ts(q.date, q.time)
+                day = q.date.replace("-", "").replace("/", "")
+            except (ValueError, IndexError):
+                ts = time.time()
+                day = market_now().strftime("%Y%m%d")
+            key = (ts, q.volume, q.price)
+            if self._last_key.get(q.code) == key:
+                continue
+            self._last_key[q.code] = key
+            d = self._days.get(day)
+            if d is None:
+                d = self._open_day(day)
+            self._append(d, q, ts)
+            n += 1
+        if self._rows >= self.flush_rows or (self._rows and time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+        return n
+
+    def _append(self, d, q, ts):
+        sym_ids = d[0]
+        sid = sym_ids.get(q.code)
+        if sid is None:
+            sid = sym_ids[q.code] = len(sym_ids)
+            d[1].append(q.code)
+        b = d[2]
+        b["sym"].append(sid)
+        b["ts"].append(ts)
+        b["open"].append(q.open)
+        b["prev_close"].append(q.prev_close)
+        b["price"].append(q.price)
+        b["high"].append(q.high)
+        b["low"].append(q.low)
+        b["bid1"].append(q.bid1)
+        b["ask1"].append(q.ask1)
+        b["volume"].append(q.volume)
+        b["amount"].append(q.amount)
+        for i in range(5):
+            b[f"bv{i + 1}"].append(q.bid_vols[i])
+            b[f"bp{i + 1}"].append(q.bid_prices[i])
+            b[f"av{i + 1}"].append(q.ask_vols[i])
+            b[f"ap{i + 1}"].append(q.ask_prices[i])
+        d[3] += 1
+        self._rows += 1
+
+    def _open_day(self, day):
+        # 本次运行首次遇到该交易日：继续写入已存在的当日文件（重启后）时沿用已有代码表；
+        # 之后只用内存中的代码表，直到 close() 都不再读文件（后台线程可能尚未写完）
+        sym_ids = {}
+        try:
+            with open(os.path.join(self.root, day, "symbols.txt"), "r", encoding="ascii") as f:
+                for i, line in enumerate(f.read().splitlines()):
+                    sym_ids[line] = i
+        except OSError:
+            pass
+        d = self._days[day] = [sym_ids, [], self._new_buffers(), 0]
+        return d
+
+    def retain(self, codes):
+        """自选变化时调用：只保留这些代码的去重状态（各交易日的代码表不变）"""
+        keep = set(codes)
+        self._last = {c: q for c, q in self._last.items() if c in keep}
+        self._last_key = {c: k for c, k in self._last_key.items() if c in keep}
+
+    def flush(self, wait=False):
+        """把缓冲交给后台线程写盘；wait=True 时等待写完"""
+        self._last_flush = time.monotonic()
+        fut = None
+        for day, d in self._days.items():
+            if d[3]:
+                job = (day, d[1], d[2], d[3])
+                d[1], d[2], d[3] = [], self._new_buffers(), 0
+                fut = self._executor.submit(self._write, *job)
+        self._rows = 0
+        if fut is None:
+            fut = self._executor.submit(lambda: None)
+        if wait:
+            fut.result()
+
+    def _write(self, day, new_syms, buf, rows):
+        path = os.path.join(self.root, day)
+        try:
+            os.makedirs(path, exist_ok=True)
+            # 先写代码表，再按列追加；读取端以最短的列为准，中途中断不会读到半条记录
+            if new_syms:
+                with open(os.path.join(path, "symbols.txt"), "a", encoding="ascii") as f:
+                    f.write("".join(c + "\n" for c in new_syms))
+            written = 0
+            for name, _ in COLUMNS:
+                with open(os.path.join(path, name + ".bin"), "ab") as f:
+                    buf[name].tofile(f)
+                written += buf[name].itemsize * len(buf[name])
+            with self._lock:
+                self.rows_written += rows
+                self.bytes_written += written
+        except OSError:
+            pass
+
+    def close(self):
+        self.flush(wait=True)
+        self._executor.shutdown(wait=True)
+
+
+class TickDay:
+    """
+    只读访问某一交易日的记录：每列 mmap 映射，按需切片，不把整个文件读入内存
+    使用完毕后调用 close()（或 with 语句）；仍被引用的列视图会推迟映射的关闭
+    """
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(os.path.join(path, "symbols.txt"), "r", encoding="ascii") as f:
+                self.symbols = f.read().splitlines()
+        except OSError:
+            self.symbols = []
+        self._ids = {c: i for i, c in enumerate(self.symbols)}
+        self._files = {}
+        self._maps = {}
+        sizes = []
+        for name, code in COLUMNS:
+            p = os.path.join(path, name + ".bin")
+            size = os.path.getsize(p) if os.path.exists(p) else 0
+            sizes.append(size // array(code).itemsize)
+        self.rows = min(sizes) if sizes else 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _map(self, name):
+        mm = self._maps.get(name)
+        if mm is None:
+            f = self._files[name] = open(os.path.join(self.path, name + ".bin"), "rb")
+            mm = self._maps[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mm
+
+    def column(self, name: str):
+        """整列（零拷贝）：安装了 numpy 时为 ndarray，否则为 memoryview"""
+        code = dict(COLUMNS)[name]
+        if self.rows == 0:
+            return array(code)
+        mm = self._map(name)
+        np = _numpy()
+        if np is not None:
+            return np.frombuffer(mm, dtype=_NP_TYPES[code], count=self.rows)
+        return memoryview(mm).cast(code)[:self.rows]
+
+    def series(self, code: str, fields=("ts", "price", "volume")) -> dict:
+        """单只股票的若干列，按写入（时间）顺序"""
+        sid = self._ids.get(code)
+        if sid is None:
+            return {f: [] for f in fields}
+        sym = self.column("sym")
+        if _numpy() is not None:
+            mask = sym == sid
+            return {f: self.column(f)[mask] for f in fields}
+        idx = [i for i, s in enumerate(sym) if s == sid]
+        out = {}
+        for f in fields:
+            col = self.column(f)
+            out[f] = [col[i] for i in idx]
+        return out
+
+    def close(self):
+        for mm in self._maps.values():
+            try:
+                mm.close()
+            except BufferError:
+                pass  # 仍有列视图在使用
+        for f in self._files.values():
+            f.close()
+        self._maps.clear()
+        self._files.clear()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="查看分笔记录")
+    ap.add_argument("--root", default=default_record_dir())
+    ap.add_argument("day", nargs="?", help="交易日 YYYYMMDD，缺省列出全部")
+    ap.add_argument("code", nargs="?", help="股票代码，如 sh600000")
+    args = ap.parse_args()
+
+    if not args.day:
+        for d in list_days(args.root):
+            with TickDay(os.path.join(args.root, d)) as td:
+                print(f"{d}  {td.rows} 条  {len(td.symbols)} 只")
+        return
+    with TickDay(os.path.join(args.root, args.day)) as td:
+        if not args.code:
+            print(f"{args.day}: {td.rows} 条, {len(td.symbols)} 只")
+            return
+        s = td.series(args.code, ("ts", "price", "volume"))
+        for ts, p, v in zip(s["ts"], s["price"], s["volume"]):
+            print(datetime.fromtimestamp(ts, MARKET_TZ).strftime("%H:%M:%S"), f"{p:.3f}", f"{v:.0f}")
+
+
+if __name__ == "__main__":
+    main()
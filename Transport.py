@@ -0,0 +1,180 @@
+import threading, time, weakref
+from concurrent.futures import ThreadPoolExecutor
+
+# ----- 新浪行情接口 -----
+SINA_BASE_URL = "https://hq.sinajs.cn"
+SINA_HEADERS = {
+    "Referer": "https://finance.sina.com.cn",
+    "User-Agent": "Mozilla/5.0",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+
+def _requests():
+    # requests 导入较慢（约 0.1 秒）：首次请求时（在后台拉取线程中）才导入
+    import requests
+    return requests
+
+
+class SinaTransport:
+    """
+    长连接 HTTP 会话：连接池 + keep-alive + gzip，连接异常时重建会话并重试一次
+    统计新建连接数与复用次数，便于观察握手开销的节省
+    自选较多时按 chunk_size 分片，最多 max_workers 个分片并发拉取
+    """
+    def __init__(self, base_url=SINA_BASE_URL, timeout=3, chunk_size=100, max_workers=4):
+        self.base_url = str(base_url).rstrip("/")
+        self.timeout = timeout
+        self.chunk_size = max(1, int(chunk_size))
+        self.max_workers = max(1, int(max_workers))
+        self.pool_size = self.max_workers
+        self._lock = threading.Lock()
+        self._executor = None
+        self._session = None
+        self._adapter = None
+        self.requests = 0          # 成功请求数
+        self.new_connections = 0   # 新建 TCP/TLS 连接数
+        self.reused = 0            # 复用已有连接的请求数
+        self.reconnects = 0        # 因连接异常重建会话的次数
+        self._socks = weakref.WeakSet()   # 已使用过的套接字：按请求判断连接是否新建
+        self.cancelled = False     # 退出中：不再发出新的分片请求，也不重试
+        self.perf = None           # Perf.PerfStats：记录等待响应头、传输、解析的耗时
+
+    def _open(self):
+        from requests.adapters import HTTPAdapter
+        session = _requests().Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(SINA_HEADERS)
+        self._session, self._adapter = session, adapter
+
+    def reset(self):
+        """丢弃当前连接池并新建会话"""
+        with self._lock:
+            old = self._session
+            self._open()
+        try:
+            if old is not None:
+                old.close()
+        except Exception:
+            pass
+
+    def cancel(self):
+        """退出前调用：排队中的分片取消，之后的请求与重连重试直接失败"""
+        self.cancelled = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def max_fetch_seconds(self, n_codes: int) -> float:
+        """一次 get_chunks 的最长耗时：每个分片最多两次请求（含重连重试），分片按 max_workers 并发"""
+        rounds = -(-max(1, -(-int(n_codes) // self.chunk_size)) // self.max_workers)
+        return self.timeout * 2 * rounds
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        try:
+            if self._session is not None:
+                self._session.close()
+        except Exception:
+            pass
+
+    def _is_new_connection(self, r) -> bool:
+        # 本次响应所用连接的套接字首次出现即为新建连接（含连接池对断开连接的重连）；
+        # 按请求判断，并发分片之间不会互相计入
+        conn = getattr(r.raw, "connection", None) or getattr(r.raw, "_connection", None)
+        sock = getattr(conn, "sock", None)
+        if sock is None:
+            return False
+        with self._lock:
+            if sock in self._socks:
+                return False
+            self._socks.add(sock)
+            return True
+
+    def _get(self, url, parser=None):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._open()
+        session = self._session
+        t0 = time.perf_counter()
+        # 始终以 stream 方式发送：读取响应体之前连接仍由响应持有，可判断是否新建
+        r = session.get(url, timeout=self.timeout, stream=True)
+        t1 = time.perf_counter()
+        opened = self._is_new_connection(r)
+        try:
+            r.raise_for_status()
+            if parser is None:
+                out = r.content
+            else:
+                # 边接收边解析（iter_content 已处理 gzip 解压）
+                parser.reset()
+                for chunk in r.iter_content(chunk_size=16384):
+                    parser.feed(chunk)
+                parser.close()
+                out = parser
+        finally:
+            r.close()  # 响应体已读完，连接归还连接池
+        t2 = time.perf_counter()
+        with self._lock:
+            self.requests += 1
+            if opened:
+                self.new_connections += 1
+            else:
+                self.reused += 1
+        perf = self.perf
+        if perf is not None and perf.enabled:
+            # 新建连接时，等待响应头的时间包含 DNS、TCP/TLS 握手，单独计入 fetch.connect
+            perf.add("fetch.connect" if opened else "fetch.headers", t1 - t0)
+            cpu = parser.cpu if parser is not None else 0.0
+            perf.add("fetch.transfer", max(0.0, t2 - t1 - cpu))
+            if parser is not None:
+                perf.add("parse", cpu)
+        return out
+
+    def get_list(self, codes, parser=None):
+        """
+        拉取 list=code1,code2,... ；parser 为 None 时返回原始响应字节，
+        否则把响应流式交给 parser.feed()，结束后 close() 并返回该 parser
+        """
+        if self.cancelled:
+            raise RuntimeError("拉取已取消")
+        url = self.base_url + "/list=" + ",".join(codes)
+        exc = _requests().exceptions
+        try:
+            return self._get(url, parser)
+        except (exc.ConnectionError, exc.ChunkedEncodingError):
+            if self.cancelled:
+                raise
+            # 服务器关闭了空闲连接或网络切换：重建会话后重试一次
+            with self._lock:
+                self.reconnects += 1
+            self.reset()
+            return self._get(url, parser)
+
+    def chunks(self, codes) -> list:
+        n = self.chunk_size
+        return [codes[i:i+n] for i in range(0, len(codes), n)]
+
+    def get_chunks(self, codes, parser_factory=None) -> list:
+        """分片并发拉取，返回与分片顺序一致的结果列表（原始字节或各分片的 parser）"""
+        parts = self.chunks(list(codes))
+        fetch = lambda part: self.get_list(part, parser_factory() if parser_factory else None)
+        if len(parts) <= 1:
+            return [fetch(p) for p in parts]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="SinaChunk")
+        return list(self._executor.map(fetch, parts))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused": self.reused,
+                "reconnects": self.reconnects,
+            }
@@ -1,16 +1,30 @@
-import requests, keyboard
+import hashlib, time
 from functools import partial
 
 from PySide6.QtCore import Qt, QEvent, QTimer, Signal
 from PySide6.QtGui import QFont, QAction, QColor
-from PySide6.QtWidgets import QApplication, QWidget, QMenu, QVBoxLayout, QLabel, QTableView, QHeaderView, QAbstractItemView, QFrame, QStyledItemDelegate
-
-from Display import SimpleTableModel, KLineDelegate
+from PySide6.QtWidgets import QApplication, QWidget, QMenu, QVBoxLayout, QLabel, QHeaderView, QAbstractItemView, QFrame, QStyledItemDelegate
+
+from Display import SimpleTableModel, KLineDelegate, SparklineDelegate, TimedTableView
+from Fetcher import QuoteFetcher
+from Transport import SinaTransport, SINA_BASE_URL
+from MarketHours import MarketScheduler, is_active, market_now
+from RefreshTiers import RefreshTiers
+from Paging import Pager
+from Backoff import FetchBackoff
+from SinaParser import StreamParser, LineCache
+from Quote import FormatOptions, MissingQuote, format_row
+from TableLayout import TableLayout
+from TickHistory import TickHistory
+from ConfigWriter import write_atomic_bytes
+from Perf import PerfStats
 
 class FloatLabel(QWidget):
     hotkey_triggered = Signal()
-    def __init__(self, cfg: dict):
+    def __init__(self, cfg: dict, live: bool = True):
+        """live=False：不拉取实时行情（回放），行情由外部调用 _on_quotes_ready 喂入"""
         super().__init__()
+        self._feed_attached = True
         self._on_change = (lambda: None)
         self._open_settings_cb = None
 
@@ -22,6 +36,11 @@ class FloatLabel(QWidget):
         codes_cfg               = cfg.get("codes",["sh000001"])             # 自选列表
         checked_codes_cfg       = cfg.get("checked_codes", cfg.get("visible_codes", codes_cfg))  # 在浮窗中显示的股票（新名 checked_codes，兼容 visible_codes）
         self.refresh_seconds    = int(cfg.get("refresh_seconds", 2))        # 刷新间隔
+        self.market_hours_only  = bool(cfg.get("market_hours_only", True))  # 仅交易时段刷新
+        self.adaptive_refresh   = bool(cfg.get("adaptive_refresh", False))  # 按活跃度分档刷新
+        self.page_size          = int(cfg.get("page_size", 0))              # 分页显示：每页行数（0 为不分页）
+        self.page_rotate_seconds = int(cfg.get("page_rotate_seconds", 10))  # 自动翻页间隔（0 为仅滚轮翻页）
+        self.page_background_every = int(cfg.get("page_background_every", 10))  # 其它页每隔多少个刷新周期拉取一页
         flags_cfg               = cfg.get("flags", {})                      # 指标开关（字典格式）
         self.short_code         = bool(cfg.get("short_code", False))
         self.name_length        = int(cfg.get("name_length",0))
@@ -47,13 +66,22 @@ class FloatLabel(QWidget):
         self.opacity_pct        = int(cfg.get("opacity_pct", 90))           # 透明度
         self.default_color      = bool(cfg.get("default_color", False))     # 默认颜色模式
 
+        self.quote_base_url     = str(cfg.get("quote_base_url", SINA_BASE_URL))  # 行情接口地址（可指向本地模拟服务）
+        self.fetch_chunk_size   = int(cfg.get("fetch_chunk_size", 100))     # 单次请求最多代码数
+        self.fetch_workers      = int(cfg.get("fetch_workers", 4))          # 分片并发数
+        self.tick_capacity      = int(cfg.get("tick_capacity", 2400))       # 每只股票保留的分时点数
+        self.record_ticks       = bool(cfg.get("record_ticks", False))      # 记录分笔数据到磁盘
+        self.record_dir         = str(cfg.get("record_dir", ""))            # 分笔数据目录（空为配置目录下 ticks）
+        self.perf_overlay       = bool(cfg.get("perf_overlay", False))      # 浮窗提示中显示各环节耗时
+        self.perf_log           = str(cfg.get("perf_log", ""))              # 耗时统计导出文件（JSON lines，空为不导出）
+
         self.hotkey             = cfg.get("hotkey", "Ctrl+Alt+F")           # 快捷键
         self.start_on_boot      = bool(cfg.get("start_on_boot", False))
 
         # 设置初值
         self.codes = [str(c).strip() for c in codes_cfg if str(c).strip()]
         # 列标题列表（提前定义，供后续旧配置解析使用）
-        self.ALL_HEADERS = ["代码", "名称", "现价", "涨跌值", "涨跌幅", "买一", "卖一", "委比", "成交量", "成交额", "均价", "K线"]
+        self.ALL_HEADERS = ["代码", "名称", "现价", "涨跌值", "涨跌幅", "买一", "卖一", "委比", "成交量", "成交额", "均价", "K线", "分时"]
 
         # 列显示标志（独立属性）
         # 解析旧 flags 配置以做回退
@@ -78,6 +106,7 @@ class FloatLabel(QWidget):
         self.amount_visible = bool(cfg.get("amount_visible", old_flags.get("成交额", False)))
         self.avg_visible = bool(cfg.get("avg_visible", old_flags.get("均价", False)))
         self.kline_visible = bool(cfg.get("kline_visible", old_flags.get("K线", False)))
+        self.spark_visible = bool(cfg.get("spark_visible", old_flags.get("分时", False)))
 
         # 设置自选显示股票（新名 checked_codes）
         self.codes = [str(c).strip() for c in codes_cfg if str(c).strip()]
@@ -87,7 +116,8 @@ class FloatLabel(QWidget):
         
         
         self.hotkey_triggered.connect(self.toggle_win)
-        self._register_hotkey()
+        # 全局快捷键库（keyboard）在窗口显示之后再加载并注册
+        QTimer.singleShot(0, self._init_hotkey)
 
         # UI
         self.panel = QWidget(self)
@@ -96,7 +126,10 @@ class FloatLabel(QWidget):
         self.vbox.setContentsMargins(10,6,10,6)
         self.vbox.setSpacing(0)
 
-        self.table = QTableView(self.panel)
+        # 热路径计时：拉取/解析/投影/模型/布局/绘制，关闭时几乎无开销
+        self.perf = PerfStats(enabled=self.perf_overlay or bool(self.perf_log))
+        self.table = TimedTableView(self.panel)
+        self.table.perf = self.perf
         self.table.setFrameShape(QFrame.NoFrame)
         self.table.setShowGrid(False)
         self.table.setSelectionMode(QAbstractItemView.NoSelection)
@@ -104,7 +137,8 @@ class FloatLabel(QWidget):
         self.table.verticalHeader().setVisible(False)
         self.table.horizontalHeader().setVisible(self.header_visible)
         self.table.horizontalHeader().setStretchLastSection(False)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        # 列宽由 TableLayout 计算后设置（ResizeToContents 会在每次数据变化时重新测量整列）
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.table.setFont(self.font)
         self.table.horizontalHeader().setFont(self.font)
         self.table.verticalHeader().setMinimumSectionSize(1)
@@ -121,10 +155,25 @@ class FloatLabel(QWidget):
         self.table.setModel(self.model)
 
         self.k_delegate = KLineDelegate(self.table, base_pt=12)
+        self.k_delegate.perf = self.perf
         self.k_delegate.update_scheme(self.default_color, self.fg)
         self.k_delegate.set_point_size(self.font.pointSize())
         self.k_column_visible_index = None
 
+        # 分时走势线：每只股票一个定长环形缓冲区，由每次轮询追加，不额外请求网络
+        self.ticks = TickHistory(self.tick_capacity)
+        self.recorder = self._open_recorder() if self.record_ticks else None
+        self.spark_delegate = SparklineDelegate(self.table, base_pt=12)
+        self.spark_delegate.perf = self.perf
+        self.spark_delegate.update_scheme(self.default_color, self.fg)
+        self.spark_delegate.set_point_size(self.font.pointSize())
+        self.spark_column_visible_index = None
+
+        # 布局缓存：最近一次投影的行/代码/列，及已应用的表格尺寸
+        self._layout = TableLayout(self.table)
+        self._proj_rows, self._proj_keys, self._proj_headers = [], [], []
+        self._fit_size = None
+
         self.vbox.addWidget(self.table)
 
         for w in (self.panel, self.table, self.table.viewport(), self.table.horizontalHeader(), self.table.verticalHeader()):
@@ -146,11 +195,45 @@ class FloatLabel(QWidget):
 
         self._drag_pos = None
 
+        # 长连接会话（连接池 + keep-alive + gzip）
+        self.transport = SinaTransport(self.quote_base_url, chunk_size=self.fetch_chunk_size, max_workers=self.fetch_workers)
+        self.transport.perf = self.perf
+
+        # 未变化行情的复用：原始行 → Quote，Quote → 显示行
+        self._line_cache = LineCache()
+        self._row_cache = {}        # code -> (quote, (格式设置, 可见列), row)
+        self._payload_digest = {}   # 请求代码元组 -> 上次已渲染响应的摘要
+        self._snapshot_version = 0  # 每次合并实时行情 +1
+        self._snapshot_saved = -1   # 已保存到离线快照文件的版本
+
+        # 后台拉取：HTTP 与解析不在 GUI 线程执行
+        self.fetcher = QuoteFetcher(self._get_price, self)
+        self.fetcher.data_ready.connect(self._on_quotes_ready)
+        self.fetcher.fetch_failed.connect(self._on_quotes_failed)
+        self._snapshot = {}   # code -> Quote，最近一次拉取到的行情
+        self.scheduler = MarketScheduler()
+        self.tiers = RefreshTiers()
+        self.pager = Pager(self.page_size, self.page_background_every)
+        self.backoff = FetchBackoff()
+        self._error_text = ""
+        self._stale_text = ""   # 显示离线快照且尚无实时数据时的快照标注
+
+        # 合并设置修改触发的刷新：短时间内多次修改只拉取一次 / 只重绘一次
+        self._refresh_debounce = QTimer(self)
+        self._refresh_debounce.setSingleShot(True)
+        self._refresh_debounce.setInterval(200)
+        self._refresh_debounce.timeout.connect(self._refresh_from_function)
+        self._reproject_debounce = QTimer(self)
+        self._reproject_debounce.setSingleShot(True)
+        self._reproject_debounce.setInterval(0)
+        self._reproject_debounce.timeout.connect(self._reproject)
+
         self.timer = QTimer(self)
         self.timer.setInterval(max(1, self.refresh_seconds)*1000)
-        self.timer.timeout.connect(self._refresh_from_function)
-        self.timer.start()
-        self._refresh_from_function()
+        self.timer.timeout.connect(self._on_timer_tick)
+        if live:
+            self.timer.start()
+            self._refresh_from_function()
         self._defer_fit()
 
         self._keep_top_timer = QTimer(self)
@@ -158,6 +241,22 @@ class FloatLabel(QWidget):
         self._keep_top_timer.timeout.connect(self._ensure_on_top)
         self._keep_top_timer.start()
 
+        # 耗时统计定时导出
+        self._perf_timer = QTimer(self)
+        self._perf_timer.setInterval(60 * 1000)
+        self._perf_timer.timeout.connect(self.export_perf)
+        if self.perf_log:
+            self._perf_timer.start()
+
+        # 分页轮播：定时翻到下一页
+        self._page_timer = QTimer(self)
+        self._page_timer.setInterval(max(1, self.page_rotate_seconds)*1000)
+        self._page_timer.timeout.connect(lambda: self._turn_page(1))
+        if self.page_rotate_seconds > 0:
+            self._page_timer.start()
+        if not live:
+            self.detach_feed()
+
     # 与 App 连接
     def set_open_settings_callback(self, fn): 
         self._open_settings_cb = fn
@@ -184,6 +283,7 @@ class FloatLabel(QWidget):
             "amount_visible": bool(getattr(self, 'amount_visible', False)),
             "avg_visible": bool(getattr(self, 'avg_visible', False)),
             "kline_visible": bool(getattr(self, 'kline_visible', False)),
+            "spark_visible": bool(getattr(self, 'spark_visible', False)),
             "short_code": self.short_code,
             "name_length": self.name_length,
             "b1s1_price": (getattr(self, 'b1s1_display', 'qty') == 'price'),
@@ -191,6 +291,19 @@ class FloatLabel(QWidget):
             "header_visible": self.header_visible,
             "grid_visible": self.grid_visible,
             "refresh_seconds": self.refresh_seconds,
+            "market_hours_only": self.market_hours_only,
+            "adaptive_refresh": self.adaptive_refresh,
+            "page_size": self.page_size,
+            "page_rotate_seconds": self.page_rotate_seconds,
+            "page_background_every": self.page_background_every,
+            "quote_base_url": self.quote_base_url,
+            "fetch_chunk_size": self.fetch_chunk_size,
+            "fetch_workers": self.fetch_workers,
+            "tick_capacity": self.tick_capacity,
+            "record_ticks": self.record_ticks,
+            "record_dir": self.record_dir,
+            "perf_overlay": self.perf_overlay,
+            "perf_log": self.perf_log,
             "fg": self.fg.name(QColor.HexRgb),
             "bg": {"r": self.bg.red(), "g": self.bg.green(), "b": self.bg.blue(), "a": self.bg.alpha()},
             "opacity_pct": int(round(self.windowOpacity()*100)),
@@ -228,6 +341,8 @@ class FloatLabel(QWidget):
                 return bool(getattr(self, 'avg_visible', False))
             if header == "K线":
                 return bool(getattr(self, 'kline_visible', False))
+            if header == "分时":
+                return bool(getattr(self, 'spark_visible', False))
         except Exception:
             pass
         return False
@@ -272,27 +387,35 @@ class FloatLabel(QWidget):
     def _apply_row_heights(self):
         fm = self.table.fontMetrics()
         h = fm.height() + max(0, self.line_extra_px)
-        self.table.verticalHeader().setDefaultSectionSize(h)
+        vh = self.table.verticalHeader()
+        if vh.defaultSectionSize() == h:
+            return  # 新插入的行自动使用默认行高
+        vh.setDefaultSectionSize(h)
         for r in range(self.model.rowCount()):
             self.table.setRowHeight(r, h)
 
     def _fit_to_contents(self):
+        # 全量测量：字体、样式、表头、错误提示等变化时
         self.table.horizontalHeader().setStretchLastSection(False)
-        self.table.resizeColumnsToContents()
-        self._apply_row_heights()
-
-        cols = self.model.columnCount()
-        rows = self.model.rowCount()
-        total_w = self.table.verticalHeader().width() + 2*self.table.frameWidth()
-        for c in range(cols): 
-            total_w += self.table.columnWidth(c)
-        hh = self.table.horizontalHeader().height() if self.table.horizontalHeader().isVisible() else 0
-        total_h = hh + 2*self.table.frameWidth()
-        for r in range(rows): 
-            total_h += self.table.rowHeight(r)
-        self.table.setFixedSize(max(1,total_w), max(1,total_h))
-        self.panel.adjustSize()
-        self.resize(self.panel.size())
+        self._layout.invalidate()
+        self._update_layout(force=True)
+
+    def _update_layout(self, force: bool = False):
+        # 每次刷新：只测量变化的单元格，窗口尺寸不变时不调整
+        with self.perf.span("fit"):
+            self._layout.update(self._proj_rows, self._proj_keys, self._proj_headers)
+            self._apply_row_heights()
+
+            hh = self.table.horizontalHeader()
+            total_w = self.table.verticalHeader().width() + 2*self.table.frameWidth() + hh.length()
+            total_h = (hh.height() if hh.isVisible() else 0) + 2*self.table.frameWidth() + self.table.verticalHeader().length()
+            size = (max(1, total_w), max(1, total_h))
+            if not force and size == self._fit_size:
+                return
+            self._fit_size = size
+            self.table.setFixedSize(*size)
+            self.panel.adjustSize()
+            self.resize(self.panel.size())
 
     def _defer_fit(self):
         QTimer.singleShot(0, self._fit_to_contents)
@@ -300,9 +423,7 @@ class FloatLabel(QWidget):
     # ----- 数据 & 投影 -----
     def _show_error(self, msg: str):
         try:
-            if self.k_column_visible_index is not None:
-                self.table.setItemDelegateForColumn(self.k_column_visible_index, QStyledItemDelegate(self.table))
-                self.k_column_visible_index = None
+            self._sync_delegates([])
         except Exception:
             pass
         try:
@@ -320,293 +441,326 @@ class FloatLabel(QWidget):
             self.error_label.setVisible(True)
         self._defer_fit()
 
+    def _show_stale(self, saved_at):
+        # 离线快照：表格照常显示，顶部标注数据时间，首次实时数据到达后由 _clear_error 清除
+        if saved_at is None:
+            self._stale_text = "离线快照"
+            text = self._stale_text
+        else:
+            fmt = "%H:%M" if time.strftime("%Y%m%d") == time.strftime("%Y%m%d", time.localtime(saved_at)) else "%m-%d %H:%M"
+            stamp = time.strftime(fmt, time.localtime(saved_at))
+            self._stale_text = f"离线快照 {stamp}"
+            text = f"离线快照（{stamp}）"
+        self.error_label.setText(text)
+        self.error_label.setVisible(True)
+        self._defer_fit()
+
     def _clear_error(self):
         # 清除顶部错误提示
         if hasattr(self, 'error_label'):
             try:
+                was_visible = not self.error_label.isHidden()
                 self.error_label.setVisible(False)
                 self.error_label.setText("")
+                if was_visible:
+                    self._defer_fit()
             except Exception:
                 pass
 
     # ----- 数据来源：新浪财经 -----
     def _get_price(self, codes:list):
-        label = ",".join([str(c).strip() for c in codes if str(c).strip()])
-        if not label:
+        codes = [str(c).strip() for c in codes if str(c).strip()]
+        if not codes:
             raise Exception("暂无数据，请添加自选")
 
-        price_data = []
-        sign_data = []
-        url = 'https://hq.sinajs.cn/list=' + label
-        headers = {'Referer': 'https://finance.sina.com.cn', 'User-Agent': 'Mozilla/5.0'}
-        r = requests.get(url, headers=headers, timeout=3)
-        r.encoding = 'gbk'
-        for line in r.text.split('\n'):
-            if not line or '"' not in line:
-                continue
-            heads = line.split('="')[0].split('_')
-            parts = line.split('="')[1].split(',')
-
-            # 判断是否为港股
-            is_hk = len(heads) > 2 and heads[2].startswith('hk')
-
-            if is_hk:
-                # 港股数据格式处理
-                # 港股返回字段较少，跳过字段数检查
-                if len(parts) < 3:
-                    continue
-
-                code = heads[2]
-                name = parts[1] if len(parts) > 1 else parts[0]
-                current_price = float(parts[6] or 0)   # 现价
-                prev_close = float(parts[3] or 0)     # 昨收
-                opening_price = float(parts[5] or 0)  # 开盘
-                high_price = float(parts[4] or 0)     # 当日最高
-                low_price = float(parts[7] or 0)      # 当日最低
-                # 港股其他字段可能不存在或格式不同
-                first_pur = 0
-                first_sell = 0
-                deals_vol = float(parts[12] or 0) if len(parts) > 12 else 0  # 成交量
-                deals_amt = 0  # 港股可能没有成交额
-
-                # 港股买一卖一数据在不同位置
-                if len(parts) > 9:
-                    first_pur = float(parts[9] or 0)   # 买一价
-                    first_sell = float(parts[10] or 0) # 卖一价
-
-                purchaser = [0] * 5
-                pur_price = [0.0] * 5
-                seller = [0] * 5
-                sel_price = [0.0] * 5
-                update_date = [0, 0, 0]
-                update_time = [0, 0, 0]
-
-                etf = False  # 港股暂不区分ETF
+        # 分片并发拉取并流式解析，按分片顺序合并，保持自选顺序；此处只解析，显示格式在投影时生成
+        quotes = []
+        digest = hashlib.blake2b(digest_size=16)
+        with self.perf.span("fetch"):
+            for parser in self.transport.get_chunks(codes, self._new_parser):
+                digest.update(parser.digest())
+                quotes.extend(parser.records)
+        return quotes, digest.digest()
 
-            else:
-                # A股/北交所数据处理
-                if len(parts) < 30:
-                    continue
-
-                code          = heads[2]
-                name          = parts[0]
-                opening_price = float(parts[1] or 0)   # 开盘
-                prev_close    = float(parts[2] or 0)   # 昨收
-                current_price = float(parts[3] or 0)   # 现价
-                high_price    = float(parts[4] or 0)   # 当日最高
-                low_price     = float(parts[5] or 0)   # 当日最低
-                first_pur     = float(parts[6] or 0)   # 买一
-                first_sell    = float(parts[7] or 0)   # 卖一
-                deals_vol     = float(parts[8] or 0)   # 成交量
-                deals_amt     = float(parts[9] or 0)   # 成交额
-                purchaser     = [int(x or 0) for x in parts[10:19:2]]  # 买盘，股数
-                pur_price     = [float(x or 0) for x in parts[11:20:2]]  # 买盘，价格
-                seller        = [int(x or 0) for x in parts[20:29:2]]  # 卖盘，股数
-                sel_price     = [float(x or 0) for x in parts[21:30:2]]  # 卖盘，价格
-                update_date   = [int(x or 0) for x in parts[30].split('-')]  # 日期
-                update_time   = [int(x or 0) for x in parts[31].split(':')]  # 时间
-
-                etf = code[2] in ('1','5')
-
-            # 构建买一/卖一数据及其颜色信息，并添加位置箭头
-            b1_label = ""
-            s1_label = ""
-            b1_color_sign = 0  # 买一颜色：1红 0中性 -1绿
-            s1_color_sign = 0  # 卖一颜色：1红 0中性 -1绿
-
-            # 决定小数精度用于比较是否相等（避免浮点微小误差）
-            dec = 3 if etf else 2
-            if is_hk:
-                dec = 2  # 港股通常2位小数
-            def almost_eq(a, b):
-                try:
-                    return round(float(a), dec) == round(float(b), dec)
-                except Exception:
-                    return False
-
-            # 标记：买一箭头位于右侧 '<'，卖一箭头位于左侧 '>'
-            buy_marker = " "
-            sell_marker = " "
-            if first_pur > 0 and almost_eq(current_price, first_pur):
-                buy_marker = "<"
-            if first_sell > 0 and almost_eq(current_price, first_sell):
-                sell_marker = ">"
-
-            if first_pur == first_sell > 0:
-                # 集合竞价：配对量 / 未配对量
-                # 此处不显示成交方向箭头（竞价阶段无 <> 指示），且配对量和未配对量使用统一颜色规则
-                current_price = first_sell  # 9:15 ~ 9:25; 14:57 ~ 15:00 竞价
-                paired = seller[0]
-                # unpaired_sign: >0 表示买方优势，<0 表示卖方优势
-                unpaired_sign = -seller[1] if seller[1] > 0 else purchaser[1]
-                # 显示数量（手）或价格或数量和价格（手数(价格)）
-                paired_cnt = int(paired/100)
-                unpaired_cnt = int(unpaired_sign/100)
-                b_price = f"{first_pur:.3f}" if etf else f"{first_pur:.2f}"
-                s_price = f"{first_sell:.3f}" if etf else f"{first_sell:.2f}"
-                mode = getattr(self, 'b1s1_display', 'qty')
-                if mode == 'price':
-                    b1_label = f"{b_price}"
-                    s1_label = f"{s_price}"
-                elif mode == 'both':
-                    b1_label = f"{paired_cnt:d}({b_price})"
-                    s1_label = f"{unpaired_cnt:+d}({s_price})"
-                else:
-                    b1_label = f"{paired_cnt:d}"
-                    s1_label = f"{unpaired_cnt:+d}"
-                # 竞价颜色：根据未配对量的方向
-                if unpaired_sign > 0:
-                    b1_color_sign = 1
-                    s1_color_sign = 1
-                elif unpaired_sign < 0:
-                    b1_color_sign = -1
-                    s1_color_sign = -1
-                else:
-                    b1_color_sign = 0
-                    s1_color_sign = 0
-            else:
-                # 连续竞价：买一数量/卖一数量
-                if first_pur > 0:
-                    cnt = f"{int(purchaser[0]/100)}"
-                    b_price = f"{first_pur:.3f}" if etf else f"{first_pur:.2f}"
-                    mode = getattr(self, 'b1s1_display', 'qty')
-                    if mode == 'price':
-                        b1_label = f"{b_price}{buy_marker}"
-                    elif mode == 'both':
-                        b1_label = f"{cnt}({b_price}){buy_marker}"
-                    else:
-                        b1_label = f"{cnt}{buy_marker}"
-                else:
-                    b1_label = f"-{buy_marker}"
-
-                if first_sell > 0:
-                    cnt = f"{int(seller[0]/100)}"
-                    s_price = f"{first_sell:.3f}" if etf else f"{first_sell:.2f}"
-                    mode = getattr(self, 'b1s1_display', 'qty')
-                    if mode == 'price':
-                        s1_label = f"{sell_marker}{s_price}"
-                    elif mode == 'both':
-                        s1_label = f"{sell_marker}{cnt}({s_price})"
-                    else:
-                        s1_label = f"{sell_marker}{cnt}"
-                else:
-                    s1_label = f"{sell_marker}-"
-
-                # 连续竞价时：买一固定红色，卖一固定绿色
-                b1_color_sign = 1
-                s1_color_sign = -1
-            
-            if current_price == 0:
-                current_price = prev_close # 9:00 ~ 9:15 无数据
-            if opening_price == 0: 
-                opening_price = current_price
-                high_price = current_price
-                low_price = current_price
-
-            change = current_price - prev_close if prev_close else 0.0
-            change_pct = (current_price / prev_close - 1) * 100 if prev_close else 0.0
-            avg = (deals_amt / deals_vol) if deals_vol > 0 else prev_close # 均价
-            p_sum, s_sum = sum(purchaser), sum(seller)
-            committee = (100 * (p_sum - s_sum) / (p_sum + s_sum)) if (p_sum + s_sum) > 0 else 0.0 # 委比
-
-            # 触及日高/低显示箭头
-            arrow = " "
-            if high_price > low_price:
-                if current_price == high_price: arrow = "↑"
-                elif current_price == low_price: arrow = "↓"
-
-            k_payload = {"k": (opening_price, current_price, high_price, low_price, prev_close)}
-
-            # "代码", "名称", "现价", "涨跌值", "涨跌幅", "买一", "卖一", "委比", "成交量", "成交额", "均价",  "K线"
-            # 判断显示格式：港股用2位小数，ETF用3位，普通A股用2位
-            if is_hk or code[2] not in ('1','5'):
-                price_data.append([
-                    code[2:] if self.short_code else code,
-                    name if self.name_length == 0 else name[:self.name_length],
-                    f"{current_price:.2f}{arrow}",
-                    f"{change:+.2f}",
-                    f"{change_pct:+.2f}%",
-                    b1_label,
-                    s1_label,
-                    f"{committee:+.2f}%" if not is_hk else "-",
-                    f"{deals_vol}" if deals_vol<1e4 else (f"{deals_vol/1e4:.2f}万" if deals_vol<1e8 else f"{deals_vol/1e8:.2f}亿"),
-                    f"{deals_amt/1e4:.2f}万" if deals_amt<1e8 else (f"{deals_amt/1e8:.2f}亿" if deals_amt<1e12 else f"{deals_amt/1e12:.2f}万亿") if not is_hk else "-",
-                    f"{avg:.2f}" if not is_hk else "-",
-                    k_payload
-                ])
-            else:
-                price_data.append([
-                    code[2:] if self.short_code else code,
-                    name if self.name_length == 0 else name[:self.name_length],
-                    f"{current_price:.3f}{arrow}",
-                    f"{change:+.3f}",
-                    f"{change_pct:+.2f}%",
-                    b1_label,
-                    s1_label,
-                    f"{committee:+.2f}%",
-                    f"{deals_vol}" if deals_vol<1e4 else (f"{deals_vol/1e4:.2f}万" if deals_vol<1e8 else f"{deals_vol/1e8:.2f}亿"),
-                    f"{deals_amt/1e4:.2f}万" if deals_amt<1e8 else (f"{deals_amt/1e8:.2f}亿" if deals_amt<1e12 else f"{deals_amt/1e12:.2f}万亿"),
-                    f"{avg:.3f}",
-                    k_payload
-                ])
-            sign_data.append({
-                "delta": (change > 0) - (change < 0), 
-                "commi": (committee > 0) - (committee < 0),
-                "avg": (avg > prev_close) - (avg < prev_close),
-                "b1": b1_color_sign,
-                "s1": s1_color_sign,
-            })
-        
-        return price_data, sign_data
+    def _new_parser(self):
+        return StreamParser(self._line_cache)
 
-    def _project_columns(self, full_rows, sign_data):
+    def _project_columns(self, quotes):
+        t0 = time.perf_counter()
         # 从 ALL_HEADERS 中按显示顺序筛选已启用的列
-        cols = [i for i, h in enumerate(self.ALL_HEADERS) if self.header_is_visible(h)]
-        headers = [self.ALL_HEADERS[i] for i in cols]
-
-        proj_rows, proj_meta = [], []
-        for r, row in enumerate(full_rows):
-            proj_rows.append([row[i] for i in cols])
-            proj_meta.append(sign_data[r])
-
-        # 右对齐：除了名称、K线、卖一外的所有列都右对齐
-        right_cols = [i for i, h in enumerate(headers) if h not in ("名称", "K线", "卖一")]
+        headers = [h for h in self.ALL_HEADERS if self.header_is_visible(h)]
+        opts = FormatOptions(self.short_code, self.name_length, self.b1s1_display)
+        fmt_key = (opts, tuple(headers))
+
+        # 只格式化可见列；行情记录未变（行缓存命中）且格式/列未变时复用上次的行
+        proj_rows = []
+        cache = self._row_cache
+        spark_col = headers.index("分时") if "分时" in headers else None
+        for q in quotes:
+            hit = cache.get(q.code)
+            if hit is not None and hit[0] is q and hit[1] == fmt_key:
+                proj_rows.append(hit[2])
+                continue
+            row = format_row(q, headers, opts)
+            if spark_col is not None and not isinstance(q, MissingQuote):
+                row[spark_col] = self.ticks.spark(q)
+            cache[q.code] = (q, fmt_key, row)
+            proj_rows.append(row)
+
+        # 右对齐：除了名称、K线、分时、卖一外的所有列都右对齐
+        right_cols = [i for i, h in enumerate(headers) if h not in ("名称", "K线", "分时", "卖一")]
         self.model.set_align_right_cols(right_cols)
-        self.model.set_rows_headers(proj_rows, headers, meta=proj_meta)
+        with self.perf.span("model"):
+            self.model.set_rows_headers(proj_rows, headers, meta=quotes)
         self.model.set_color_scheme(self.default_color, self.fg)
 
-        if "K线" in headers:
-            col = headers.index("K线")
-            self.k_column_visible_index = col
-            self.k_delegate.update_scheme(self.default_color, self.fg)
-            self.k_delegate.set_point_size(self.font.pointSize())
-            self.table.setItemDelegateForColumn(col, self.k_delegate)
-        else:
-            if self.k_column_visible_index is not None:
-                self.table.setItemDelegateForColumn(self.k_column_visible_index, QStyledItemDelegate(self.table))
-                self.k_column_visible_index = None
-
-        self._fit_to_contents()
+        for d in (self.k_delegate, self.spark_delegate):
+            d.update_scheme(self.default_color, self.fg)
+            d.set_point_size(self.font.pointSize())
+        self._sync_delegates(headers)
+
+        self._proj_rows, self._proj_keys, self._proj_headers = proj_rows, [q.code for q in quotes], headers
+        self._update_layout()
+        # project 包含其中的 model 与 fit
+        self.perf.add("project", time.perf_counter() - t0)
+
+    def _sync_delegates(self, headers):
+        # K线 / 分时 列使用自定义委托；列位置变化时才重新设置（先全部还原，再设置新位置）
+        want = {}
+        for header, delegate, attr in (("K线", self.k_delegate, "k_column_visible_index"),
+                                       ("分时", self.spark_delegate, "spark_column_visible_index")):
+            col = headers.index(header) if header in headers else None
+            if col == getattr(self, attr):
+                continue
+            want[attr] = (col, delegate)
+        if not want:
+            return
+        for attr in want:
+            cur = getattr(self, attr)
+            if cur is not None:
+                self.table.setItemDelegateForColumn(cur, QStyledItemDelegate(self.table))
+        for attr, (col, delegate) in want.items():
+            if col is not None:
+                self.table.setItemDelegateForColumn(col, delegate)
+            setattr(self, attr, col)
+        self._layout.invalidate()
 
     def _refresh_from_function(self):
+        # 交给后台线程拉取；已有请求在途时仅排队一次。分页时只拉取当前页
+        self.fetcher.request(self.pager.visible(self.checked_codes))
+
+    def _request_refresh(self):
+        # 自选变化：合并到一次拉取
+        self._refresh_debounce.start()
+
+    def _request_reproject(self):
+        # 纯显示变化（列、代码/名称格式、买一卖一模式）：基于最近一次快照重新投影，不发起网络请求
+        self._reproject_debounce.start()
+
+    def _reproject(self):
+        self._project_snapshot()
+
+    def _on_timer_tick(self):
+        # 失败退避 / 熔断期间跳过本次定时刷新，仅更新“数据已过期”提示
+        if not self.backoff.allow():
+            self._update_error_age()
+            return
+        now = market_now()
+        if self.market_hours_only:
+            # 仅拉取处于交易时段（或刚收盘待补拉）的市场的代码
+            due = self.scheduler.due_codes(self.checked_codes, now)
+        else:
+            due = list(self.checked_codes)
+        if self.pager.enabled(self.checked_codes):
+            # 分页：当前页全速，其它页低频轮流
+            wanted = set(self.pager.due(self.checked_codes))
+            due = [c for c in due if c in wanted]
+        if not due:
+            return
+        if not self.adaptive_refresh:
+            self.fetcher.request(due)
+            return
+        # 自适应：交易中的代码按活跃度分档，每档单独一次请求（在途时依次排队，不合并）；首次/收盘补拉不分档
+        trading = [c for c in due if not self.market_hours_only or is_active(c, now)]
+        trading_set = set(trading)
+        others = [c for c in due if c not in trading_set]
+        batches = ([others] if others else []) + list(self.tiers.due_batches(trading))
+        self.fetcher.request_batches(batches)
+
+    def _on_quotes_ready(self, codes, result):
+        quotes, digest = result
+        self.backoff.record_success()
+        self._error_text = ""
+        self._stale_text = ""
+        # 响应与上次完全相同：跳过快照合并、模型更新与布局
+        key = tuple(codes)
+        if digest == self._payload_digest.get(key) and self.error_label.isHidden():
+            return
+        if len(self._payload_digest) > 64:
+            self._payload_digest.clear()
+        self._payload_digest[key] = digest
+        self._snapshot_version += 1
+        # 按代码合并进快照；请求了却没有返回的代码视为无效代码
+        fresh = {q.code: q for q in quotes}
+        now = time.time()
+        for c in codes:
+            q = fresh.get(c)
+            if q is not None:
+                self._snapshot[c] = q
+                self.tiers.observe(c, (q.price, q.volume))
+                self.ticks.observe(q, now)
+            else:
+                self._snapshot.pop(c, None)
+        if self.recorder is not None:
+            self.recorder.record(quotes)
         try:
-            full_rows, sign = self._get_price(self.checked_codes)
-        except Exception as e:
-            try:
-                import requests as _req
-                if isinstance(e, _req.exceptions.RequestException):
-                    self._show_error(_req.exceptions.RequestException())
-                else:
-                    self._show_error(str(e))
-            except Exception:
-                self._show_error(str(e))
+            self._clear_error()
+        except Exception:
+            pass
+        self._project_snapshot()
+        self._update_tooltip()
+
+    def _update_tooltip(self):
+        st = self.transport.stats()
+        text = f"连接：新建 {st['new_connections']} / 复用 {st['reused']} / 重连 {st['reconnects']}"
+        if self.pager.enabled(self.checked_codes):
+            text += f"\n第 {self.pager.page + 1}/{self.pager.page_count(self.checked_codes)} 页（滚轮翻页）"
+        if self.perf_overlay:
+            perf_text = self.perf.text()
+            if perf_text:
+                text += "\n" + perf_text
+        self.setToolTip(text)
+
+    def export_perf(self) -> int:
+        """把当前耗时统计追加到 perf_log（JSON lines）"""
+        if not self.perf_log:
+            return 0
+        try:
+            return self.perf.export_jsonl(self.perf_log)
+        except OSError:
+            return 0
+
+    def _project_snapshot(self):
+        snap = self._snapshot
+        visible = self.pager.visible(self.checked_codes)
+        if self.pager.enabled(self.checked_codes):
+            # 分页：无行情的代码显示占位行，各页行数相同，翻页时浮窗尺寸不变
+            self._project_columns([snap.get(c) or MissingQuote(c) for c in visible])
+        else:
+            self._project_columns([snap[c] for c in visible if c in snap])
+
+    def _turn_page(self, step):
+        # 翻页：先用快照（后台页的数据）立即显示，再拉取新的当前页
+        if not self.isVisible() or not self.pager.turn(self.checked_codes, step):
             return
+        self._project_snapshot()
+        self._update_tooltip()
+        if self._feed_attached and self.backoff.allow():
+            self.fetcher.request(self.pager.visible(self.checked_codes))
 
+    def _on_quotes_failed(self, codes, e):
+        text = str(e)
         try:
-            self._clear_error()
+            import requests as _req
+            if isinstance(e, _req.exceptions.RequestException):
+                text = "无网络连接"
         except Exception:
             pass
-        self._project_columns(full_rows, sign)
+        self.backoff.record_failure()
+        self._error_text = text
+        self._show_error(text + self._error_age_suffix())
+
+    def _error_age_suffix(self) -> str:
+        parts = []
+        age = self.backoff.seconds_since_success()
+        if age is not None:
+            m, sec = divmod(int(age), 60)
+            parts.append(f"数据已过期 {m}分{sec:02d}秒" if m else f"数据已过期 {sec}秒")
+        elif self._stale_text:
+            # 离线启动后尚未拉取成功：保留快照时间，避免旧行情看起来像实时数据
+            parts.append(self._stale_text)
+        if self.backoff.is_open:
+            parts.append("暂停刷新，定时重试")
+        return f"（{'，'.join(parts)}）" if parts else ""
+
+    def _update_error_age(self):
+        if self._error_text and self.error_label.isVisible():
+            self.error_label.setText(self._error_text + self._error_age_suffix())
+
+    def shutdown(self):
+        """退出前停止后台拉取线程"""
+        try:
+            self.timer.stop()
+            # 先取消排队的分片，再按最坏情况（超时 × 重试 × 分片轮数）等待在途拉取结束，
+            # 避免线程仍在运行时被销毁
+            self.transport.cancel()
+            wait_ms = int(self.transport.max_fetch_seconds(len(self.checked_codes)) * 1000) + 1000
+            self.fetcher.stop(wait_ms)
+            self.transport.close()
+        except Exception:
+            pass
+        if self.recorder is not None:
+            try:
+                self.recorder.close()
+            except Exception:
+                pass
+            self.recorder = None
+        self.export_perf()
+
+    # ----- 离线快照 -----
+    def save_snapshot(self, path: str) -> bool:
+        """把自选股最近一次的原始行情行写入 path；自上次保存后没有新数据时不写"""
+        if self._snapshot_saved == self._snapshot_version:
+            return False
+        lines = self._line_cache.raw_lines(self.checked_codes)
+        if not lines:
+            return False
+        try:
+            write_atomic_bytes(path, b"#saved %.0f\n" % time.time() + b"\n".join(lines) + b"\n")
+        except OSError:
+            return False
+        self._snapshot_saved = self._snapshot_version
+        return True
+
+    def restore_snapshot(self, path: str) -> bool:
+        """启动时显示上次保存的行情（标注为离线快照），随后由后台的实时拉取替换"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        saved_at = None
+        if data.startswith(b"#saved "):
+            head, _, data = data.partition(b"\n")
+            try:
+                saved_at = float(head[7:])
+            except ValueError:
+                pass
+        parser = self._new_parser()
+        parser.feed(data)
+        checked = set(self.checked_codes)
+        quotes = [q for q in parser.close() if q.code in checked]
+        if not quotes or self._snapshot:
+            return False
+        for q in quotes:
+            self._snapshot[q.code] = q
+        self._snapshot_saved = self._snapshot_version   # 与文件内容相同，无需再写
+        self._project_snapshot()
+        self._show_stale(saved_at)
+        return True
+
+    def detach_feed(self):
+        """停止实时拉取，改由外部（回放）调用 _on_quotes_ready 喂入行情"""
+        if not self._feed_attached:
+            return
+        self._feed_attached = False
+        self._page_timer.stop()
+        self.timer.timeout.disconnect(self._on_timer_tick)
+        self.timer.stop()
+        self._refresh_debounce.timeout.disconnect(self._refresh_from_function)
+        self.fetcher.invalidate()
+        self.fetcher.data_ready.disconnect(self._on_quotes_ready)
+        self.fetcher.fetch_failed.disconnect(self._on_quotes_failed)
 
     # ----- 应用设置 -----
     def set_codes(self, codes_list):
@@ -620,8 +774,9 @@ class FloatLabel(QWidget):
         if not new: 
             new = ["sh000001"]
         self.codes = new
+        self.fetcher.invalidate()
         self._notify_change()
-        self._refresh_from_function()
+        self._request_refresh()
 
     def set_checked_codes(self, codes_list):
         seen = set()
@@ -634,8 +789,17 @@ class FloatLabel(QWidget):
         if not new: 
             new = ["sh000001"]
         self.checked_codes = new
+        self._snapshot = {c: v for c, v in self._snapshot.items() if c in new}
+        self.tiers.forget(new)
+        self.ticks.forget(new)
+        self._line_cache.retain(new)
+        if self.recorder is not None:
+            self.recorder.retain(new)
+        self._row_cache = {c: v for c, v in list(self._row_cache.items()) if c in new}
+        self._payload_digest.clear()
+        self.fetcher.invalidate()
         self._notify_change()
-        self._refresh_from_function()
+        self._request_refresh()
 
     def set_flag(self, idx, checked: bool):
         """设置指标显示标志。idx 可以是整数索引（向后兼容）或列标题字符串"""
@@ -675,6 +839,8 @@ class FloatLabel(QWidget):
                 prev = bool(getattr(self, 'avg_visible', False)); self.avg_visible = checked
             elif header == "K线":
                 prev = bool(getattr(self, 'kline_visible', False)); self.kline_visible = checked
+            elif header == "分时":
+                prev = bool(getattr(self, 'spark_visible', False)); self.spark_visible = checked
         except Exception:
             prev = None
 
@@ -683,18 +849,18 @@ class FloatLabel(QWidget):
             if prev == checked:
                 return
         self._notify_change()
-        self._refresh_from_function()
+        self._request_reproject()
 
     def set_code_type(self, pure_num: bool):
         self.short_code = bool(pure_num)
         self._notify_change()
-        self._refresh_from_function()
+        self._request_reproject()
 
     def set_name_length(self, name_len: int):
         if name_len >=0:
             self.name_length = name_len
             self._notify_change()
-            self._refresh_from_function()
+            self._request_reproject()
 
     def set_b1s1_display(self, mode: str):
         """mode: 'qty' | 'price' | 'both'"""
@@ -702,7 +868,7 @@ class FloatLabel(QWidget):
             return
         self.b1s1_display = mode
         self._notify_change()
-        self._refresh_from_function()
+        self._request_reproject()
 
     def set_header_visible(self, vis: bool):
         self.header_visible = bool(vis)
@@ -721,9 +887,64 @@ class FloatLabel(QWidget):
             self.timer.setInterval(seconds*1000)
             self._notify_change()
 
+    def set_market_hours_only(self, enabled: bool):
+        self.market_hours_only = bool(enabled)
+        self.scheduler.reset()
+        self._notify_change()
+
+    def set_adaptive_refresh(self, enabled: bool):
+        self.adaptive_refresh = bool(enabled)
+        self.tiers.reset()
+        self._notify_change()
+
+    def _open_recorder(self):
+        from TickRecorder import TickRecorder
+        return TickRecorder(self.record_dir or None)
+
+    def set_record_ticks(self, enabled: bool):
+        self.record_ticks = bool(enabled)
+        if self.record_ticks and self.recorder is None:
+            self.recorder = self._open_recorder()
+        elif not self.record_ticks and self.recorder is not None:
+            try:
+                self.recorder.close()
+            except Exception:
+                pass
+            self.recorder = None
+        self._notify_change()
+
+    def set_page_size(self, n: int):
+        n = max(0, int(n))
+        if n == self.page_size:
+            return
+        self.page_size = n
+        self.pager.page_size = self.page_size
+        self.pager.page = 0
+        self._request_reproject()
+        self._request_refresh()
+        self._notify_change()
+
+    def set_perf_overlay(self, enabled: bool):
+        self.perf_overlay = bool(enabled)
+        self.perf.enabled = self.perf_overlay or bool(self.perf_log)
+        if not self.perf.enabled:
+            self.perf.reset()
+        self._update_tooltip()
+        self._notify_change()
+
+    def _restyle_delegates(self):
+        # K线 / 分时 委托的颜色与缩放立即更新（不等下一次行情），之后的全量测量按新缩放计算列宽
+        for d in (self.k_delegate, self.spark_delegate):
+            d.update_scheme(self.default_color, self.fg)
+            d.set_point_size(self.font.pointSize())
+            d.clear_cache()
+        self.table.viewport().update()
+
     def set_fg_color(self, c: QColor):
         if isinstance(c, QColor) and c.isValid():
             self.fg = QColor(c)
+            self.model.set_color_scheme(self.default_color, self.fg)
+            self._restyle_delegates()
             self.apply_style()
             self._notify_change()
 
@@ -750,10 +971,9 @@ class FloatLabel(QWidget):
     def set_font_size(self, pt: int):
         pt = max(8, min(15, int(pt)))
         self.font.setPointSize(pt)
-        self.k_delegate.set_point_size(pt)
+        self._restyle_delegates()
         self.apply_style()
         self._notify_change()
-        self.table.viewport().update()
         self._defer_fit()
 
     def set_font_family(self, family: str):
@@ -771,7 +991,7 @@ class FloatLabel(QWidget):
     def set_default_color(self, enabled: bool):
         self.default_color = bool(enabled)
         self.model.set_color_scheme(self.default_color, self.fg)
-        self.k_delegate.update_scheme(self.default_color, self.fg)
+        self._restyle_delegates()
         self.apply_style()
         self._notify_change()
         self._defer_fit()
@@ -814,6 +1034,11 @@ class FloatLabel(QWidget):
         act_color.toggled.connect(self.set_default_color)
         menu.addAction(act_color)
 
+        act_perf = QAction("性能统计", menu, checkable=True)
+        act_perf.setChecked(self.perf_overlay)
+        act_perf.toggled.connect(self.set_perf_overlay)
+        menu.addAction(act_perf)
+
         menu.addSeparator()
         act_open_settings = QAction("设置…", menu)
         act_open_settings.triggered.connect(self._open_settings_cb)
@@ -845,6 +1070,13 @@ class FloatLabel(QWidget):
             self.hide()
 
     def eventFilter(self, obj, ev):
+        if ev.type() == QEvent.Wheel and self.pager.enabled(self.checked_codes):
+            dy = ev.angleDelta().y()
+            if dy:
+                self._turn_page(-1 if dy > 0 else 1)
+                if self._page_timer.isActive():
+                    self._page_timer.start()   # 手动翻页后重新计时
+            return True
         if ev.type() == QEvent.MouseButtonDblClick and hasattr(ev, "button") and ev.button() == Qt.LeftButton:
             self._drag_pos = None
             self.hide()
@@ -895,7 +1127,14 @@ class FloatLabel(QWidget):
             pass
         self.raise_()
 
+    def _init_hotkey(self):
+        try:
+            self._register_hotkey()
+        except Exception:
+            pass
+
     def _register_hotkey(self):
+        import keyboard
         try:
             keyboard.remove_all_hotkeys()
         except Exception:
@@ -0,0 +1,59 @@
+"""
+分片并发拉取基准：本地模拟行情服务，对比单次请求与分片并发的延迟
+
+    python bench/bench_fetch.py [--latency 0.03] [--repeat 5]
+"""
+import argparse, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SinaSimulator import SinaSimulator
+from Transport import SinaTransport
+
+
+def _codes(n):
+    return [f"sh{600000 + i:06d}" for i in range(n)]
+
+
+def _measure(transport, codes, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        try:
+            transport.get_chunks(codes)
+        except Exception:
+            return None
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency", type=float, default=0.03, help="模拟服务端每次请求的延迟（秒）")
+    ap.add_argument("--per-symbol", type=float, default=0.0002, help="模拟服务端每个代码的处理耗时（秒）")
+    ap.add_argument("--max-url", type=int, default=8192, help="模拟服务端 URL 长度上限，超出返回 414")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--chunk", type=int, default=100)
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+
+    server = SinaSimulator(latency=args.latency, per_symbol=args.per_symbol, max_url=args.max_url)
+    base = server.start()
+
+    single = SinaTransport(base, chunk_size=10**9, max_workers=1)
+    chunked = SinaTransport(base, chunk_size=args.chunk, max_workers=args.workers)
+    print(f"{'symbols':>8} {'single(ms)':>11} {'chunked(ms)':>12}")
+    for n in (50, 500, 5000):
+        codes = _codes(n)
+        t_single = _measure(single, codes, args.repeat)
+        t_chunked = _measure(chunked, codes, args.repeat)
+        fmt = lambda t: f"{t*1000:.1f}" if t is not None else "failed"
+        print(f"{n:>8} {fmt(t_single):>11} {fmt(t_chunked):>12}")
+    print("chunked transport:", chunked.stats())
+    single.close()
+    chunked.close()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+布局微基准：每次刷新的表格测量与窗口尺寸调整耗时（offscreen Qt）
+对比原做法（ResizeToContents 表头 + 每次 resizeColumnsToContents / 逐行 setRowHeight / 调整窗口）与 TableLayout 增量测量
+
+    QT_QPA_PLATFORM=offscreen python bench/bench_layout.py [--rows 20 200] [--ticks 50] [--activity 0.3]
+
+update+fit：模型更新与测量；events：随后处理视图的延迟布局与重绘
+"""
+import argparse, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import QApplication, QTableView, QHeaderView, QFrame
+
+from Display import SimpleTableModel, KLineDelegate
+from Quote import FormatOptions, format_row
+from SinaParser import LineCache, StreamParser
+from SinaSimulator import QuoteBook
+from TableLayout import TableLayout
+
+HEADERS = ["代码", "名称", "现价", "涨跌幅", "买一", "卖一", "成交量", "成交额", "K线"]
+OPTS = FormatOptions(False, 0, "qty")
+
+
+def make_table(resize_mode):
+    table = QTableView()
+    table.setFrameShape(QFrame.NoFrame)
+    table.verticalHeader().setVisible(False)
+    table.horizontalHeader().setSectionResizeMode(resize_mode)
+    table.setFont(QFont("Microsoft YaHei", 10))
+    model = SimpleTableModel(headers=HEADERS)
+    table.setModel(model)
+    table.setItemDelegateForColumn(HEADERS.index("K线"), KLineDelegate(table))
+    table.show()
+    return table, model
+
+
+def legacy_fit(table, model, state):
+    table.resizeColumnsToContents()
+    h = table.fontMetrics().height() + 1
+    table.verticalHeader().setDefaultSectionSize(h)
+    for r in range(model.rowCount()):
+        table.setRowHeight(r, h)
+    total_w = sum(table.columnWidth(c) for c in range(model.columnCount()))
+    total_h = sum(table.rowHeight(r) for r in range(model.rowCount()))
+    table.setFixedSize(max(1, total_w), max(1, total_h))
+
+
+def cached_fit(table, model, state):
+    state["layout"].update(state["rows"], state["keys"], HEADERS)
+    vh = table.verticalHeader()
+    h = table.fontMetrics().height() + 1
+    if vh.defaultSectionSize() != h:
+        vh.setDefaultSectionSize(h)
+    size = (max(1, table.horizontalHeader().length()), max(1, vh.length()))
+    if size != state.get("size"):
+        state["size"] = size
+        table.setFixedSize(*size)
+
+
+def run(app, n_rows, ticks, activity, resize_mode, fit):
+    table, model = make_table(resize_mode)
+    state = {"layout": TableLayout(table)}
+    codes = [f"sh60{i:04d}" for i in range(n_rows - n_rows // 10)] + [f"sz15{i:04d}" for i in range(n_rows // 10)]
+    book = QuoteBook(seed=7, activity=activity)
+    cache = LineCache()
+    rows_cache = {}
+    t_fit = t_events = 0.0
+    for _ in range(ticks):
+        p = StreamParser(cache)
+        p.feed(book.payload(codes).encode("gbk"))
+        quotes = p.close()
+        rows = []
+        for q in quotes:
+            hit = rows_cache.get(q.code)
+            if hit is None or hit[0] is not q:
+                hit = rows_cache[q.code] = (q, format_row(q, HEADERS, OPTS))
+            rows.append(hit[1])
+        state["rows"], state["keys"] = rows, [q.code for q in quotes]
+        t0 = time.perf_counter()
+        model.set_rows_headers(rows, HEADERS, meta=quotes)
+        fit(table, model, state)
+        t1 = time.perf_counter()
+        app.processEvents()   # 视图延迟的布局（ResizeToContents 在此重新测量）与重绘
+        t2 = time.perf_counter()
+        t_fit += t1 - t0
+        t_events += t2 - t1
+    widths = [table.columnWidth(c) for c in range(model.columnCount())]
+    table.close()
+    return t_fit / ticks, t_events / ticks, widths, state["layout"]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[20, 200])
+    ap.add_argument("--ticks", type=int, default=50)
+    ap.add_argument("--activity", type=float, default=0.3, help="每次刷新中单只股票变化的概率")
+    args = ap.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    print(f"ticks: {args.ticks}, activity: {args.activity}")
+    print(f"{'rows':>5}  {'':8}{'update+fit':>12}{'events':>12}{'total':>12}  (ms/tick)")
+    for n in args.rows:
+        f_old, e_old, w_old, _ = run(app, n, args.ticks, args.activity, QHeaderView.ResizeToContents, legacy_fit)
+        f_new, e_new, w_new, lay = run(app, n, args.ticks, args.activity, QHeaderView.Fixed, cached_fit)
+        for name, f, e in (("legacy", f_old, e_old), ("cached", f_new, e_new)):
+            print(f"{n:5d}  {name:8}{f * 1e3:12.3f}{e * 1e3:12.3f}{(f + e) * 1e3:12.3f}")
+        print(f"       update+fit x{f_old / f_new:.2f}, total x{(f_old + e_old) / (f_new + e_new):.2f}"
+              f"   (full {lay.full_count}, measured {lay.measured}, widths {'==' if w_old == w_new else '!='})")
+
+
+if __name__ == "__main__":
+    main()
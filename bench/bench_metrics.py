@@ -0,0 +1,78 @@
+"""
+派生指标微基准：逐行计算（Quote._derive）与 NumPy 批量计算（bench/quote_batch.py）
+涨跌、涨跌幅、均价、委比、K 线四价、集合竞价未配对量、颜色符号
+
+    python bench/bench_metrics.py [--sizes 100 500 1000 5000] [--repeat 20]
+
+loop：         每只股票调用一次 Quote._derive
+batch compute：原始字段已在数组中，只做向量化计算
+batch e2e：    从 Quote 列表取字段 + 向量化计算 + 写回 Quote
+结果：compute 快于逐行计算，但 e2e 更慢（取字段与写回的成本超过计算本身），因此实时路径仍逐行计算
+"""
+import argparse, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import quote_batch
+from quote_batch import QuoteBatch as Batch, DERIVED
+from SinaParser import parse_payload
+from SinaSimulator import QuoteBook
+
+
+def make_quotes(n):
+    # 约 80% 沪市个股、10% 深市 ETF、10% 港股；部分为集合竞价（买一价 == 卖一价）
+    codes = ([f"sh60{i:04d}" for i in range(n - n // 5)] + [f"sz15{i:04d}" for i in range(n // 10)]
+             + [f"hk{i:05d}" for i in range(n // 5 - n // 10)])
+    quotes = parse_payload(QuoteBook(seed=3, activity=1.0).payload(codes).encode("gbk"))
+    for q in quotes[::7]:
+        if not q.is_hk:
+            q.bid1 = q.ask1
+            q.bid_prices = (q.ask1,) + q.bid_prices[1:]
+    return quotes
+
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def check(quotes):
+    expect = [tuple(getattr(q, f) for f in DERIVED) for q in quotes]
+    for q in quotes:
+        q._derive()
+    Batch.from_quotes(quotes).derive().apply(quotes)
+    got = [tuple(getattr(q, f) for f in DERIVED) for q in quotes]
+    return sum(1 for a, b in zip(expect, got) if a != b)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 5000])
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+    if not quote_batch.available():
+        print("未安装 numpy")
+        return
+
+    print(f"{'rows':>6}{'loop':>12}{'compute':>12}{'e2e':>12}{'compute x':>11}{'e2e x':>8}  (ms, best of {args.repeat})  mismatch")
+    for n in args.sizes:
+        quotes = make_quotes(n)
+        batch = Batch.from_quotes(quotes)
+
+        def loop():
+            for q in quotes:
+                q._derive()
+
+        t_loop = timeit(loop, args.repeat)
+        t_compute = timeit(batch.derive, args.repeat)
+        t_e2e = timeit(lambda: Batch.from_quotes(quotes).derive().apply(quotes), args.repeat)
+        print(f"{n:6d}{t_loop * 1e3:12.3f}{t_compute * 1e3:12.3f}{t_e2e * 1e3:12.3f}"
+              f"{t_loop / t_compute:11.1f}{t_loop / t_e2e:8.2f}  {check(quotes):>28}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+解析微基准：5000 行模拟响应，对比原 _get_price 的字符串解析与 SinaParser 的字节级解析
+
+    python bench/bench_parser.py [--lines 5000] [--repeat 10]
+"""
+import argparse, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SinaParser import LineCache, StreamParser, parse_payload
+from SinaSimulator import QuoteBook
+
+
+def legacy_parse(content: bytes) -> list:
+    """原实现的解析部分：整体 GBK 解码，每行两次 split('=\"')，逐字段建列表"""
+    out = []
+    for line in content.decode("gbk").split("\n"):
+        if not line or '"' not in line:
+            continue
+        heads = line.split('="')[0].split('_')
+        parts = line.split('="')[1].split(',')
+        if len(heads) > 2 and heads[2].startswith('hk'):
+            if len(parts) < 3:
+                continue
+            out.append((heads[2], parts[1], float(parts[6] or 0), float(parts[3] or 0), float(parts[5] or 0),
+                        float(parts[4] or 0), float(parts[7] or 0), float(parts[12] or 0) if len(parts) > 12 else 0))
+            continue
+        if len(parts) < 30:
+            continue
+        out.append((
+            heads[2], parts[0],
+            float(parts[1] or 0), float(parts[2] or 0), float(parts[3] or 0), float(parts[4] or 0), float(parts[5] or 0),
+            float(parts[6] or 0), float(parts[7] or 0), float(parts[8] or 0), float(parts[9] or 0),
+            [int(x or 0) for x in parts[10:19:2]], [float(x or 0) for x in parts[11:20:2]],
+            [int(x or 0) for x in parts[20:29:2]], [float(x or 0) for x in parts[21:30:2]],
+            [int(x or 0) for x in parts[30].split('-')], [int(x or 0) for x in parts[31].split(':')],
+        ))
+    return out
+
+
+def stream_parse(content: bytes, chunk=16384, cache=None) -> list:
+    p = StreamParser(cache)
+    for i in range(0, len(content), chunk):
+        p.feed(content[i:i + chunk])
+    return p.close()
+
+
+def _bench(fn, data, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(data)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    n_hk = args.lines // 10
+    codes = [f"sh{600000 + i:06d}" for i in range(args.lines - n_hk)] + [f"hk{i:05d}" for i in range(n_hk)]
+    data = QuoteBook(activity=1.0).payload(codes).encode("gbk")
+    assert len(parse_payload(data)) == len(legacy_parse(data)) == args.lines
+
+    print(f"payload: {args.lines} lines, {len(data) / 1024:.0f} KiB")
+    cache = LineCache()
+    stream_parse(data, cache=cache)   # 预热：之后的轮询全部命中行缓存
+    cached = lambda d: stream_parse(d, cache=cache)
+    results = [(name, _bench(fn, data, args.repeat)) for name, fn in
+               (("legacy (str)", legacy_parse), ("parse_payload", parse_payload), ("StreamParser", stream_parse),
+                ("unchanged+cache", cached))]
+    base = results[0][1]
+    for name, t in results:
+        print(f"{name:<16} {t * 1000:8.2f} ms  {args.lines / t:>10.0f} lines/s  x{base / t:.2f}")
+
+
+if __name__ == "__main__":
+    main()
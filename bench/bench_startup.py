@@ -0,0 +1,144 @@
+"""
+启动耗时基准：各模块导入时间（python -X importtime）、首个窗口显示时间、首次数据到达时间
+每次测量都在新的子进程中进行；行情来自本进程内的 SinaSimulator，不访问网络
+
+    python bench/bench_startup.py [--runs 5] [--rows 20] [--latency 0.05] [--baseline REV]
+
+--baseline REV：把 git 中的旧版本导出到临时目录，用同样的方法测量并对比
+"""
+import argparse, io, json, os, statistics, subprocess, sys, tarfile, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 子进程：从解释器启动后开始计时（T0 由父进程在启动子进程前写入环境变量）
+CHILD = r'''
+import json, os, sys, time
+T0 = float(os.environ["SW_BENCH_T0"])
+marks = {"interpreter": time.time() - T0}
+sys.path.insert(0, os.environ["SW_BENCH_ROOT"])
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+t = time.time()
+if sys.platform == "win32":
+    import App   # 含 App 自身的导入（托盘、设置对话框等）
+from WidgetPanel import FloatLabel
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QApplication
+marks["imports"] = time.time() - t
+
+def mark(k):
+    marks.setdefault(k, time.time() - T0)
+
+def finish():
+    marks["modules"] = sorted(m for m in ("requests", "keyboard", "numpy", "SettingPanel", "winreg") if m in sys.modules)
+    print("SW_BENCH " + json.dumps(marks), flush=True)
+    os._exit(0)
+
+if sys.platform != "win32":
+    # keyboard 在非 Windows 上注册全局快捷键需要 root：忽略注册失败，只测耗时
+    _reg = FloatLabel._register_hotkey
+    def _safe(self):
+        try:
+            _reg(self)
+        except Exception:
+            pass
+    FloatLabel._register_hotkey = _safe
+
+app = QApplication(sys.argv)
+w = FloatLabel(json.loads(os.environ["SW_BENCH_CFG"]))
+mark("constructed")
+w.show()
+QTimer.singleShot(0, lambda: mark("first_window"))
+w.fetcher.data_ready.connect(lambda *a: (mark("first_data"), QTimer.singleShot(0, finish)))
+QTimer.singleShot(15000, finish)
+app.exec()
+'''
+
+STAGES = ("interpreter", "imports", "constructed", "first_window", "first_data")
+
+
+def import_times(root, module="WidgetPanel", top=12):
+    """-X importtime：返回 (总导入时间, [(累计微秒, 模块)])，按累计时间排序"""
+    env = dict(os.environ, PYTHONPATH=root)
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                       cwd=root, env=env, capture_output=True, text=True)
+    rows = []
+    for line in r.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cum, name = line[len("import time:"):].split("|")
+            cum = int(cum)
+        except ValueError:
+            continue
+        # 只统计第一、二层（缩进 <= 2），避免同一时间被子模块重复计入
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 2:
+            rows.append((cum, name.strip(), depth))
+    total = next((c for c, n, d in rows if n == module), 0)
+    rows = sorted((r for r in rows if r[1] != module), reverse=True)[:top]
+    return total, rows
+
+
+def startup_once(root, cfg):
+    env = dict(os.environ, SW_BENCH_ROOT=root, SW_BENCH_CFG=json.dumps(cfg))
+    env["SW_BENCH_T0"] = repr(time.time())
+    r = subprocess.run([sys.executable, "-c", CHILD], cwd=root, env=env, capture_output=True, text=True, timeout=60)
+    for line in r.stdout.splitlines():
+        if line.startswith("SW_BENCH "):
+            return json.loads(line[len("SW_BENCH "):])
+    raise RuntimeError(r.stderr.strip().splitlines()[-1] if r.stderr.strip() else "子进程没有输出")
+
+
+def measure(root, cfg, runs):
+    samples = [startup_once(root, cfg) for _ in range(runs)]
+    med = {k: statistics.median(s[k] for s in samples if k in s) for k in STAGES if any(k in s for s in samples)}
+    return med, samples[-1].get("modules", [])
+
+
+def export_rev(rev, dest):
+    data = subprocess.run(["git", "archive", rev], cwd=ROOT, capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        tar.extractall(dest)
+
+
+def report(name, root, cfg, runs):
+    total, rows = import_times(root)
+    med, modules = measure(root, cfg, runs)
+    print(f"== {name}")
+    print(f"  import WidgetPanel: {total / 1e3:.1f} ms   (已加载: {', '.join(modules) or '-'})")
+    for cum, mod, depth in rows:
+        print(f"    {'  ' * depth}{mod:<32}{cum / 1e3:8.1f} ms")
+    print("  " + "  ".join(f"{k} {v * 1e3:.0f}ms" for k, v in med.items()))
+    return total, med
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--rows", type=int, default=20)
+    ap.add_argument("--latency", type=float, default=0.05, help="模拟行情服务的响应延迟（秒）")
+    ap.add_argument("--baseline", help="对比的 git 版本，如 HEAD~1")
+    args = ap.parse_args()
+
+    from SinaSimulator import SinaSimulator
+    sim = SinaSimulator(latency=args.latency)
+    base = sim.start()
+    codes = [f"sh60{i:04d}" for i in range(args.rows)]
+    cfg = {"codes": codes, "market_hours_only": False, "quote_base_url": base,
+           "name_visible": True, "price_visible": True, "change_pct_visible": True}
+    print(f"runs: {args.runs}（中位数）, rows: {args.rows}, latency: {args.latency}s；时间均从启动子进程算起")
+    try:
+        cur = report("当前", ROOT, cfg, args.runs)
+        if args.baseline:
+            with tempfile.TemporaryDirectory() as d:
+                export_rev(args.baseline, d)
+                old = report(args.baseline, d, cfg, args.runs)
+            print(f"== 对比：import {old[0] / 1e3:.1f} → {cur[0] / 1e3:.1f} ms；" + "，".join(
+                f"{k} {old[1][k] * 1e3:.0f} → {cur[1][k] * 1e3:.0f} ms" for k in STAGES if k in old[1] and k in cur[1]))
+    finally:
+        sim.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+热路径基准套件（offscreen Qt，不访问网络）：
+  get_price  FloatLabel._get_price 经本地模拟服务拉取并解析 bench/fixtures 中录制的行情
+  parse      StreamParser 直接解析同一响应（空行缓存，纯解析吞吐）
+  model      SimpleTableModel.set_rows_headers 增量更新
+  paint      QTableView + KLineDelegate 整表重绘
+fixtures：a_share（沪深京，含停牌与空行情）、etf（3 位小数）、hk（港股）、auction（早盘/尾盘集合竞价），
+按行数循环复制并改写代码；每个刷新周期以 activity 概率改动单只股票的价格
+
+    QT_QPA_PLATFORM=offscreen python bench/bench_suite.py [--rows 10 100 1000] [--ticks 30] [--save out.json] [--baseline old.json]
+
+输出每次调用的中位耗时、每秒行数及 Python 分配峰值（tracemalloc）；--baseline 对比此前 --save 的结果
+"""
+import argparse, glob, json, os, platform, random, statistics, sys, time, tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import QApplication, QTableView, QHeaderView, QFrame
+
+from Display import SimpleTableModel, KLineDelegate
+from Quote import FormatOptions, format_row
+from SinaParser import LineCache, StreamParser
+from SinaSimulator import SinaSimulator
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+HEADERS = ["代码", "名称", "现价", "涨跌幅", "买一", "卖一", "成交量", "成交额", "K线"]
+OPTS = FormatOptions(False, 0, "qty")
+
+
+# ----- 行情数据 -----
+
+def load_fixtures() -> dict:
+    """{名称: [原始行(bytes)]}；另加 mixed（全部 fixtures 依次拼接）"""
+    out = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.txt"))):
+        with open(path, "rb") as f:
+            out[os.path.splitext(os.path.basename(path))[0]] = [l for l in f.read().splitlines(keepends=True) if l.strip()]
+    out["mixed"] = [l for k in sorted(out) for l in out[k]]
+    return out
+
+
+def _code(line: bytes) -> bytes:
+    k = line.find(b"hq_str_") + 7
+    return line[k:line.find(b"=", k)]
+
+
+def expand(lines, n) -> list:
+    """循环复制到 n 行，代码改写为唯一值（保留市场前缀与首位数字，ETF 判断不变）"""
+    out = []
+    for i in range(n):
+        line = lines[i % len(lines)]
+        code = _code(line)
+        new = code[:2] + f"{i:05d}".encode() if code.startswith(b"hk") else code[:3] + f"{i:05d}".encode()
+        out.append(line.replace(b"hq_str_" + code + b"=", b"hq_str_" + new + b"=", 1))
+    return out
+
+
+def _bump_field(p, i, pct):
+    s = p[i]
+    v = float(s or 0)
+    if v <= 0:
+        return
+    dec = len(s) - s.find(b".") - 1 if b"." in s else 0
+    p[i] = f"{v * (1 + pct):.{dec}f}".encode()
+
+
+def bump(line: bytes, pct: float) -> bytes:
+    """现价按 pct 变动；集合竞价行（买一 == 卖一）同时移动虚拟撮合价"""
+    q = line.find(b'="')
+    end = line.find(b'"', q + 2)
+    if end <= q + 2:
+        return line
+    p = line[q + 2:end].split(b",")
+    if _code(line).startswith(b"hk"):
+        _bump_field(p, 6, pct)
+    else:
+        _bump_field(p, 3, pct)
+        if len(p) > 21 and p[6] == p[7]:
+            for i in (6, 7, 11, 21):
+                _bump_field(p, i, pct)
+    return line[:q + 2] + b",".join(p) + line[end:]
+
+
+def make_frames(lines, ticks, activity, seed=25) -> list:
+    """ticks 个刷新周期的响应行；未改动的行与上一周期字节相同（行缓存可命中）"""
+    rng = random.Random(seed)
+    cur = list(lines)
+    frames = [cur]
+    for _ in range(ticks - 1):
+        cur = [bump(l, rng.choice((-0.002, -0.001, 0.001, 0.002))) if rng.random() < activity else l for l in cur]
+        frames.append(cur)
+    return frames
+
+
+class FixtureBook:
+    """替换 SinaSimulator.book：按 frame 返回录制的行（忽略请求的代码以外的行）"""
+    def __init__(self, frames):
+        self.frames = [{_code(l).decode("ascii"): l.decode("gbk") for l in fr} for fr in frames]
+        self.frame = 0
+
+    def payload(self, codes) -> str:
+        fr = self.frames[self.frame]
+        return "".join(fr.get(c, f'var hq_str_{c}="";\n') for c in codes)
+
+
+# ----- 计时与内存 -----
+
+def measure(step, ticks):
+    """step(i) 执行第 i 个周期并返回本周期计时的秒数；返回 (中位秒数, tracemalloc 峰值 KiB)"""
+    times = [step(i) for i in range(ticks)]
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        for i in range(min(ticks, 5)):
+            step(i)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return statistics.median(times), peak / 1024
+
+
+def rss_mb():
+    """进程峰值常驻内存（MB）；Windows 上不可用返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    v = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return v / (1024 * 1024) if sys.platform == "darwin" else v / 1024
+
+
+# ----- 各项基准 -----
+
+def bench_get_price(sim, frames):
+    """以轻量对象调用 FloatLabel._get_price，不构造浮窗（免去快捷键注册、置顶定时器等噪声）"""
+    from types import SimpleNamespace
+    from Perf import PerfStats
+    from Transport import SinaTransport
+    from WidgetPanel import FloatLabel
+    codes = [_code(l).decode("ascii") for l in frames[0]]
+    cache = LineCache()
+    w = SimpleNamespace(transport=SinaTransport(sim.base_url), perf=PerfStats(),
+                        _new_parser=lambda: StreamParser(cache))
+    sim.book = FixtureBook(frames)
+
+    def step(i):
+        sim.book.frame = i % len(frames)
+        t0 = time.perf_counter()
+        quotes, _ = FloatLabel._get_price(w, codes)
+        dt = time.perf_counter() - t0
+        assert quotes
+        return dt
+    try:
+        step(0)   # 建立连接
+        return measure(step, len(frames))
+    finally:
+        w.transport.close()
+
+
+def bench_parse(frames):
+    payloads = [b"".join(fr) for fr in frames]
+
+    def step(i):
+        p = StreamParser(LineCache())
+        t0 = time.perf_counter()
+        p.feed(payloads[i % len(payloads)])
+        p.close()
+        return time.perf_counter() - t0
+    return measure(step, len(frames))
+
+
+def _formatted(frames):
+    """各周期的 (行, 行情)；与浮窗一样复用未变化记录的格式化结果"""
+    cache, rows_cache, out = LineCache(), {}, []
+    for fr in frames:
+        p = StreamParser(cache)
+        p.feed(b"".join(fr))
+        quotes = p.close()
+        rows = []
+        for q in quotes:
+            hit = rows_cache.get(q.code)
+            if hit is None or hit[0] is not q:
+                hit = rows_cache[q.code] = (q, format_row(q, HEADERS, OPTS))
+            rows.append(hit[1])
+        out.append((rows, quotes))
+    return out
+
+
+def bench_model(frames):
+    data = _formatted(frames)
+    model = SimpleTableModel(headers=HEADERS)
+    model.set_rows_headers(data[-1][0], HEADERS, meta=data[-1][1])
+
+    def step(i):
+        rows, quotes = data[i % len(data)]
+        t0 = time.perf_counter()
+        model.set_rows_headers(rows, HEADERS, meta=quotes)
+        return time.perf_counter() - t0
+    return measure(step, len(data))
+
+
+def bench_paint(app, frames):
+    data = _formatted(frames)
+    table = QTableView()
+    table.setFrameShape(QFrame.NoFrame)
+    table.verticalHeader().setVisible(False)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    table.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+    table.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+    table.setFont(QFont("Microsoft YaHei", 10))
+    model = SimpleTableModel(headers=HEADERS)
+    table.setModel(model)
+    delegate = KLineDelegate(table)
+    table.setItemDelegateForColumn(HEADERS.index("K线"), delegate)
+    model.set_rows_headers(data[0][0], HEADERS, meta=data[0][1])
+    table.resizeColumnsToContents()
+    table.verticalHeader().setDefaultSectionSize(table.fontMetrics().height() + 1)
+    # 整表可见（与浮窗按内容定尺寸一致），重绘覆盖全部行
+    table.setFixedSize(max(1, table.horizontalHeader().length()),
+                       max(1, table.horizontalHeader().height() + table.verticalHeader().length()))
+    table.show()
+    app.processEvents()
+
+    def step(i):
+        rows, quotes = data[i % len(data)]
+        model.set_rows_headers(rows, HEADERS, meta=quotes)
+        t0 = time.perf_counter()
+        table.viewport().repaint()
+        return time.perf_counter() - t0
+    try:
+        return measure(step, len(data))
+    finally:
+        table.close()
+        table.deleteLater()
+        app.processEvents()
+
+
+# ----- 报告 -----
+
+def _row(key, n, sec, peak, base):
+    line = f"{key:<22}{n:>6}{sec * 1e3:>11.3f}{n / sec if sec > 0 else 0:>13.0f}{peak:>11.0f}"
+    old = (base or {}).get(f"{key}/{n}")
+    if old and sec > 0:
+        line += f"{old['ms']:>11.3f}  x{old['ms'] / (sec * 1e3):.2f}"
+    print(line)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--ticks", type=int, default=30, help="每项测量的刷新周期数（取中位数）")
+    ap.add_argument("--activity", type=float, default=0.3, help="每个周期单只股票变化的概率")
+    ap.add_argument("--only", nargs="+", choices=("get_price", "parse", "model", "paint"),
+                    default=["get_price", "parse", "model", "paint"])
+    ap.add_argument("--save", help="结果写入 JSON 文件，供之后 --baseline 对比")
+    ap.add_argument("--baseline", help="此前 --save 的 JSON 文件")
+    args = ap.parse_args()
+
+    base = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            base = json.load(f)["results"]
+
+    app = QApplication.instance() or QApplication([])
+    fixtures = load_fixtures()
+    kinds = [k for k in fixtures if k != "mixed"] + ["mixed"]
+    results = {}
+
+    def record(key, n, sec, peak):
+        results[f"{key}/{n}"] = {"ms": round(sec * 1e3, 4), "rows_per_s": round(n / sec) if sec > 0 else 0,
+                                 "py_peak_kib": round(peak, 1)}
+        _row(key, n, sec, peak, base)
+
+    print(f"Python {platform.python_version()}, Qt {os.environ.get('QT_QPA_PLATFORM')}, "
+          f"ticks: {args.ticks}, activity: {args.activity}")
+    print(f"{'case':<22}{'rows':>6}{'ms/call':>11}{'rows/s':>13}{'peak KiB':>11}" + (f"{'base ms':>11}" if base else ""))
+    sim = SinaSimulator() if "get_price" in args.only else None
+    if sim is not None:
+        sim.start()
+    try:
+        for n in args.rows:
+            for kind in kinds:
+                frames = make_frames(expand(fixtures[kind], n), args.ticks, args.activity)
+                if "get_price" in args.only:
+                    record(f"get_price/{kind}", n, *bench_get_price(sim, frames))
+                if "parse" in args.only:
+                    record(f"parse/{kind}", n, *bench_parse(frames))
+            frames = make_frames(expand(fixtures["mixed"], n), args.ticks, args.activity)
+            if "model" in args.only:
+                record("model", n, *bench_model(frames))
+            if "paint" in args.only:
+                record("paint/kline", n, *bench_paint(app, frames))
+    finally:
+        if sim is not None:
+            sim.stop()
+
+    rss = rss_mb()
+    if rss is not None:
+        print(f"峰值常驻内存: {rss:.0f} MB")
+    if args.save:
+        meta = {"python": platform.python_version(), "platform": platform.platform(), "ticks": args.ticks,
+                "activity": args.activity, "time": time.strftime("%Y-%m-%d %H:%M:%S"), "max_rss_mb": rss}
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
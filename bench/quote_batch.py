@@ -0,0 +1,110 @@
+from operator import attrgetter
+from itertools import chain
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖：未安装时只能逐行计算（Quote._derive）
+    np = None
+
+# ----- 批量（向量化）派生指标 -----
+# 把整张自选表的原始字段按列放入 NumPy 数组，一次算出全部派生指标与颜色符号
+# 规则与 Quote._derive 完全一致（逐元素结果相同）
+# 仅供 bench_metrics.py 对比：从 Quote 取字段再写回的端到端耗时慢于逐行计算，实时路径不使用
+
+_RAW = ("open", "prev_close", "price", "high", "low", "bid1", "ask1", "volume", "amount")
+_get_raw = attrgetter(*_RAW)
+_get_bid_vols = attrgetter("bid_vols")
+_get_ask_vols = attrgetter("ask_vols")
+
+# 写回 Quote 的派生字段（顺序与 QuoteBatch.derived() 一致）
+DERIVED = ("last", "k_open", "k_high", "k_low", "auction", "unpaired", "change", "change_pct", "avg",
+           "committee", "sign_delta", "sign_commi", "sign_avg", "sign_b1", "sign_s1")
+
+
+def available() -> bool:
+    return np is not None
+
+
+class QuoteBatch:
+    """
+    一批行情的列式存储
+    - 原始字段：每个字段一个 float64 数组；五档买/卖量为 (n, 5) 数组
+    - derive() 之后派生字段同名存为数组
+    """
+    def __init__(self, open, prev_close, price, high, low, bid1, ask1, volume, amount, bid_vols, ask_vols):
+        if np is None:
+            raise RuntimeError("QuoteBatch 需要 numpy")
+        f = np.float64
+        self.open = np.asarray(open, f)
+        self.prev_close = np.asarray(prev_close, f)
+        self.price = np.asarray(price, f)
+        self.high = np.asarray(high, f)
+        self.low = np.asarray(low, f)
+        self.bid1 = np.asarray(bid1, f)
+        self.ask1 = np.asarray(ask1, f)
+        self.volume = np.asarray(volume, f)
+        self.amount = np.asarray(amount, f)
+        self.bid_vols = np.asarray(bid_vols, f).reshape(-1, 5)
+        self.ask_vols = np.asarray(ask_vols, f).reshape(-1, 5)
+
+    def __len__(self):
+        return len(self.price)
+
+    @classmethod
+    def from_quotes(cls, quotes):
+        """从 Quote 列表取原始字段（逐对象读取属性，成本与逐行计算相当）"""
+        n = len(quotes)
+        raw = np.fromiter(chain.from_iterable(map(_get_raw, quotes)), np.float64, count=n * len(_RAW))
+        raw = raw.reshape(n, len(_RAW))
+        bv = np.fromiter(chain.from_iterable(map(_get_bid_vols, quotes)), np.float64, count=n * 5)
+        av = np.fromiter(chain.from_iterable(map(_get_ask_vols, quotes)), np.float64, count=n * 5)
+        return cls(*raw.T, bv, av)
+
+    def derive(self):
+        prev, bv, av = self.prev_close, self.bid_vols, self.ask_vols
+        # 买一价 == 卖一价 > 0：集合竞价，现价取虚拟撮合价；未配对量 >0 买方优势，<0 卖方优势
+        auction = (self.bid1 == self.ask1) & (self.ask1 > 0)
+        unpaired = np.where(auction, np.where(av[:, 1] > 0, -av[:, 1], bv[:, 1]), 0.0)
+        s_unpaired = np.sign(unpaired).astype(np.int8)
+        self.auction = auction
+        self.unpaired = unpaired
+        self.sign_b1 = np.where(auction, s_unpaired, 1).astype(np.int8)
+        self.sign_s1 = np.where(auction, s_unpaired, -1).astype(np.int8)
+
+        last = np.where(auction, self.ask1, self.price)
+        last = np.where(last == 0, prev, last)
+        no_open = self.open == 0
+        self.k_open = np.where(no_open, last, self.open)
+        self.k_high = np.where(no_open, last, self.high)
+        self.k_low = np.where(no_open, last, self.low)
+        self.last = last
+
+        has_prev = prev != 0
+        safe_prev = np.where(has_prev, prev, 1.0)
+        self.change = np.where(has_prev, last - prev, 0.0)
+        self.change_pct = np.where(has_prev, (last / safe_prev - 1) * 100, 0.0)
+        traded = self.volume > 0
+        self.avg = np.where(traded, self.amount / np.where(traded, self.volume, 1.0), prev)
+        p_sum, s_sum = bv.sum(axis=1), av.sum(axis=1)
+        total = p_sum + s_sum
+        self.committee = np.where(total > 0, 100 * (p_sum - s_sum) / np.where(total > 0, total, 1.0), 0.0)
+        self.sign_delta = np.sign(self.change).astype(np.int8)
+        self.sign_commi = np.sign(self.committee).astype(np.int8)
+        self.sign_avg = np.sign(self.avg - prev).astype(np.int8)
+        return self
+
+    def derived(self):
+        """派生字段的 Python 列表（顺序同 DERIVED），供写回 Quote"""
+        out = []
+        for name in DERIVED:
+            v = getattr(self, name).tolist()
+            if name == "unpaired":
+                v = [int(x) for x in v]   # 与逐行计算一致：挂单量为整数
+            out.append(v)
+        return out
+
+    def apply(self, quotes):
+        """把派生字段写回 quotes（与构造时顺序一致）"""
+        for q, vals in zip(quotes, zip(*self.derived())):
+            (q.last, q.k_open, q.k_high, q.k_low, q.auction, q.unpaired, q.change, q.change_pct, q.avg,
+             q.committee, q.sign_delta, q.sign_commi, q.sign_avg, q.sign_b1, q.sign_s1) = vals
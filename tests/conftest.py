@@ -0,0 +1,13 @@
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    # 整个测试会话共用一个 QApplication（部件测试需要 QApplication，不能先建 QCoreApplication）
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
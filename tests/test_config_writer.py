@@ -0,0 +1,32 @@
+import json, os
+
+import ConfigWriter
+from ConfigWriter import ConfigWriter as Writer
+
+
+def test_failed_write_is_retried(qapp, tmp_path, monkeypatch):
+    path = str(tmp_path / "SW_config.json")
+    cfg = {"codes": ["sh600000"]}
+    real = ConfigWriter.write_atomic
+    calls = []
+
+    def failing_once(p, text):
+        calls.append(text)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        real(p, text)
+
+    monkeypatch.setattr(ConfigWriter, "write_atomic", failing_once)
+    w = Writer(path, lambda: cfg)
+    try:
+        w.flush()
+        assert w.errors == 1 and not os.path.exists(path)
+        # 配置未变：失败后仍须重新写入，而不是当作“未变化”跳过
+        w.flush()
+        with open(path, "r", encoding="utf-8") as f:
+            assert json.load(f) == cfg
+        assert w.writes == 1 and len(calls) == 2
+        w.flush()
+        assert w.unchanged == 1 and len(calls) == 2
+    finally:
+        w.close()
@@ -0,0 +1,20 @@
+from SinaParser import parse_payload
+from TickHistory import TickHistory
+
+
+def _quote(price, volume=1000):
+    fields = ["名", f"{price:.2f}", "1200.00", f"{price:.2f}", f"{price:.2f}", f"{price:.2f}",
+              f"{price:.2f}", f"{price + 0.01:.2f}", str(volume), "1000.000"] + ["100", f"{price:.2f}"] * 10
+    fields += ["2026-10-16", "10:00:00", "00"]
+    return parse_payload(f'var hq_str_sh600519="{",".join(fields)}";\n'.encode("gbk"))[0]
+
+
+def test_unchanged_price_is_not_appended_again():
+    h = TickHistory(capacity=16)
+    for price in (1234.56, 88.88):
+        h.forget([])
+        assert h.observe(_quote(price), 1.0)
+        # 新的行情对象，价格与成交量未变：不重复追加
+        assert not h.observe(_quote(price), 2.0)
+        assert len(h.ring("sh600519")) == 1
+        assert h.ring("sh600519").last()[1] == price
@@ -0,0 +1,29 @@
+from SinaParser import parse_payload
+from TickRecorder import TickDay, TickRecorder
+
+
+def _quote(code, date, hms, price, volume):
+    fields = ["名", f"{price:.2f}", "10.00", f"{price:.2f}", "11.00", "9.00", "10.00", "10.01", str(volume), "1000.0"]
+    fields += ["100", "10.00"] * 10 + [date, hms, "00"]
+    return parse_payload(f'var hq_str_{code}="{",".join(fields)}";\n'.encode("gbk"))[0]
+
+
+def test_interleaved_days_keep_symbol_ids(tmp_path):
+    root = str(tmp_path)
+    r = TickRecorder(root, flush_rows=1)
+    days = ["2026-10-14", "2026-10-15", "2026-10-16"]
+    codes = ["sh600000", "sz000001", "sz300750"]
+    # 每轮依次写三个交易日（第一个交易日在另外两个之后重新出现），每条记录后台写盘
+    for i in range(5):
+        for k, date in enumerate(days):
+            for j, code in enumerate(codes[k:] + codes[:k]):
+                r.record([_quote(code, date, f"10:00:{i:02d}", 10 + j + i / 100, 100 + i)])
+    r.retain(["sh600000"])
+    assert set(r._last) == {"sh600000"}
+    r.close()
+    for k, date in enumerate(days):
+        with TickDay(f"{root}/{date.replace('-', '')}") as td:
+            assert td.symbols == codes[k:] + codes[:k]
+            for j, code in enumerate(td.symbols):
+                prices = list(td.series(code, ("price",))["price"])
+                assert prices == [round(10 + j + i / 100, 2) for i in range(5)]
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from Perf import PerfStats
+from SinaParser import StreamParser
+from SinaSimulator import SinaSimulator
+from Transport import SinaTransport
+
+
+def test_concurrent_chunks_count_their_own_connections():
+    sim = SinaSimulator(latency=0.05)
+    base = sim.start()
+    t = SinaTransport(base, chunk_size=10, max_workers=4)
+    t.perf = PerfStats(enabled=True)
+    codes = [f"sh60{i:04d}" for i in range(40)]
+    try:
+        for _ in range(3):
+            parsers = t.get_chunks(codes, StreamParser)
+            assert sum(len(p.records) for p in parsers) == 40
+        st = t.stats()
+        # 首轮 4 个分片并发：各自新建连接；之后全部复用
+        assert st["new_connections"] == 4 and st["reused"] == 8
+        summary = t.perf.summary()
+        assert summary["fetch.connect"]["n"] == 4
+        assert summary["fetch.headers"]["n"] == 8
+    finally:
+        t.close()
+        sim.stop()
+
+
+def test_cancel_stops_queued_chunks_and_bounds_wait():
+    sim = SinaSimulator(latency=0.2)
+    base = sim.start()
+    t = SinaTransport(base, timeout=3, chunk_size=10, max_workers=2)
+    codes = [f"sh60{i:04d}" for i in range(80)]
+    try:
+        # 8 个分片 / 2 并发 = 4 轮，每轮最多两次请求
+        assert t.max_fetch_seconds(len(codes)) == 3 * 2 * 4
+        assert t.max_fetch_seconds(0) == 3 * 2
+        err = []
+        th = threading.Thread(target=lambda: _run(t, codes, err))
+        start = time.perf_counter()
+        th.start()
+        time.sleep(0.05)
+        t.cancel()
+        th.join(5)
+        # 在途分片完成后即返回，排队的分片不再请求
+        assert not th.is_alive() and err
+        assert time.perf_counter() - start < 0.2 * 4
+        assert t.new_connections + t.reused <= 2
+    finally:
+        t.close()
+        sim.stop()
+
+
+def _run(t, codes, err):
+    try:
+        t.get_chunks(codes, StreamParser)
+    except Exception as e:
+        err.append(e)
@@ -0,0 +1,63 @@
+import os
+
+from WidgetPanel import FloatLabel
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench", "fixtures")
+CODES = ["sh600000", "sh600519", "sz000001"]
+
+
+def _result(w):
+    with open(os.path.join(FIXTURES, "a_share.txt"), "rb") as f:
+        data = f.read()
+    p = w._new_parser()
+    p.feed(data)
+    quotes = [q for q in p.close() if q.code in CODES]
+    return quotes, p.digest()
+
+
+def test_identical_payload_after_failure_clears_error_while_hidden(qapp):
+    w = FloatLabel({"codes": CODES, "market_hours_only": False, "kline_visible": True,
+                    "price_visible": True}, live=False)
+    try:
+        assert not w.isVisible()
+        w._on_quotes_ready(CODES, _result(w))
+        k_col = w.k_column_visible_index
+        assert k_col is not None and w.model.rowCount() == 3
+
+        w._on_quotes_failed(CODES, Exception("boom"))
+        assert not w.error_label.isHidden()
+        assert w.k_column_visible_index is None
+
+        # 窗口隐藏时收到与失败前完全相同的响应：仍须清除错误并恢复 K线 委托
+        w._on_quotes_ready(CODES, _result(w))
+        assert w.error_label.isHidden()
+        assert w.k_column_visible_index == k_col
+        assert w.table.itemDelegateForColumn(k_col) is w.k_delegate
+    finally:
+        w.shutdown()
+        w.deleteLater()
+
+
+def test_pages_keep_fixed_height_and_same_page_size_is_noop(qapp):
+    codes = CODES + ["sh600200", "sh601318", "sh688981", "sh699999"]   # sh699999 无行情
+    w = FloatLabel({"codes": codes, "market_hours_only": False, "page_size": 3, "page_rotate_seconds": 0,
+                    "price_visible": True}, live=False)
+    changes = []
+    w._on_change = lambda: changes.append(1)
+    try:
+        p = w._new_parser()
+        with open(os.path.join(FIXTURES, "a_share.txt"), "rb") as f:
+            p.feed(f.read())
+        w._on_quotes_ready(codes, (p.close(), p.digest()))
+        for page in range(w.pager.page_count(codes)):
+            w.pager.page = page
+            w._project_snapshot()
+            assert w.model.rowCount() == 3
+        assert "sh699999" in w._proj_keys
+
+        w.pager.page = 1
+        w.set_page_size(3)
+        assert w.pager.page == 1 and not changes
+    finally:
+        w.shutdown()
+        w.deleteLater()